@@ -104,6 +104,8 @@ def demo_spiral():
     num_points = 1000
     
     prev_x, prev_y = center_x, center_y
+    segments = []
+    intensities = []
     
     for i in range(1, num_points):
         t = i / num_points
@@ -114,11 +116,14 @@ def demo_spiral():
         y = center_y + radius * math.sin(angle)
         
         # 根据半径计算颜色强度
-        intensity = 0.5 + 0.5 * (1 - t)
-        wu.draw_line(prev_x, prev_y, x, y, intensity)
+        intensities.append(0.5 + 0.5 * (1 - t))
+        segments.append((prev_x, prev_y, x, y))
         
         prev_x, prev_y = x, y
     
+    # 所有线段一次绘制
+    wu.draw_lines(np.array(segments), np.array(intensities))
+    
     wu.save_image("demo_spiral.png")
     print("螺旋图形演示完成，结果保存为 demo_spiral.png")
 
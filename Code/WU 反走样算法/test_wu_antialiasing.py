@@ -2,9 +2,13 @@
 
 import unittest
 import numpy as np
+import gc
 import math
 import matplotlib.pyplot as plt
 import os
+import tempfile
+from multiprocessing import shared_memory
+import wu_antialiasing
 from wu_antialiasing import WuAntialiasing, draw_circle_points, draw_star
 
 
@@ -145,6 +149,167 @@ class TestWuAntialiasing(unittest.TestCase):
         # 保存测试结果
         self.wu.save_image("test_color_intensity.png")
         print("颜色强度测试完成，结果保存为 test_color_intensity.png")
+    
+    def _render_scalar(self, draw):
+        """关闭向量化（所有中间部分逐像素绘制），返回画布"""
+        saved = wu_antialiasing.VECTORIZE_MIN_SPAN
+        wu_antialiasing.VECTORIZE_MIN_SPAN = float('inf')
+        try:
+            wu = WuAntialiasing(self.width, self.height)
+            draw(wu)
+            return wu.canvas
+        finally:
+            wu_antialiasing.VECTORIZE_MIN_SPAN = saved
+    
+    def test_vectorized_matches_scalar(self):
+        """测试向量化绘制与逐像素绘制的结果逐位相同"""
+        segments = np.random.default_rng(0).uniform(-80, 280, (200, 4))
+        shapes = [
+            lambda wu: wu.draw_line(10, 50, 190, 50),
+            lambda wu: wu.draw_line(100, 10, 100, 190),
+            lambda wu: wu.draw_line(10, 10, 190, 190),
+            lambda wu: wu.draw_line(10, 100, 190, 110),
+            lambda wu: draw_circle_points(wu, 100, 100, 80, 50),
+            lambda wu: draw_star(wu, 100, 100, 80, 40, 5),
+            # 超出画布的直线
+            lambda wu: [wu.draw_line(*coords, 0.7) for coords in segments],
+        ]
+        for draw in shapes:
+            expected = self._render_scalar(draw)
+            self.wu.clear()
+            draw(self.wu)
+            np.testing.assert_array_equal(
+                self.wu.canvas.view(np.uint32), expected.view(np.uint32)
+            )
+    
+    def test_draw_lines_matches_draw_line(self):
+        """测试批量绘制与逐条调用 draw_line 的结果逐位相同"""
+        rng = np.random.default_rng(1)
+        segments = rng.uniform(-40, 240, (300, 4))
+        segments[0, 2:] = segments[0, :2]      # 单点
+        segments[1, 3] = segments[1, 1]        # 水平线
+        segments[2, 2] = segments[2, 0]        # 垂直线
+        segments[3:60] = np.round(segments[3:60] * 2) / 2  # 端点在半像素上
+        segments[60:63] = [[-900, 30.3, 2400.7, 170.2],       # 远长于其它线段，逐条累加
+                           [20.4, -1500, 150.6, 1800.1],
+                           [2000.2, 190.5, -700.9, 12.3]]
+        colors = rng.uniform(0.1, 1.2, len(segments))
+        
+        for s, c in zip(segments, colors):
+            self.wu.draw_line(*s.tolist(), float(c))
+        batch = WuAntialiasing(self.width, self.height)
+        batch.draw_lines(segments, colors)
+        np.testing.assert_array_equal(
+            batch.canvas.view(np.uint32), self.wu.canvas.view(np.uint32)
+        )
+        
+        # 空输入不改变画布
+        batch.draw_lines(np.empty((0, 4)))
+        np.testing.assert_array_equal(batch.canvas, self.wu.canvas)
+    
+    def test_composite_modes(self):
+        """测试像素合成方式：批量与逐条绘制一致，max / add 与绘制顺序无关"""
+        rng = np.random.default_rng(2)
+        segments = rng.uniform(60, 140, (80, 4))  # 集中在画布中部，大量重叠
+        colors = rng.uniform(0.2, 1.0, len(segments))
+        shuffled = rng.permutation(len(segments))
+        
+        for mode in ('replace', 'max', 'add', 'over'):
+            sequential = WuAntialiasing(self.width, self.height, mode)
+            for s, c in zip(segments, colors):
+                sequential.draw_line(*s.tolist(), float(c))
+            batch = WuAntialiasing(self.width, self.height, mode)
+            batch.draw_lines(segments, colors)
+            reordered = WuAntialiasing(self.width, self.height, mode)
+            reordered.draw_lines(segments[shuffled], colors[shuffled])
+            
+            if mode == 'add':
+                # 批量方式先求和再截断，只有舍入差异
+                np.testing.assert_allclose(batch.canvas, sequential.canvas, atol=1e-6)
+                np.testing.assert_allclose(reordered.canvas, batch.canvas, atol=1e-6)
+            else:
+                np.testing.assert_array_equal(
+                    batch.canvas.view(np.uint32), sequential.canvas.view(np.uint32)
+                )
+            if mode == 'max':
+                np.testing.assert_array_equal(reordered.canvas, batch.canvas)
+            self.assertLessEqual(batch.canvas.max(), 1.0)
+        
+        # 重叠的线条不会擦除彼此的覆盖度
+        single = WuAntialiasing(self.width, self.height)
+        single.draw_line(10, 100, 190, 100)
+        crossed = WuAntialiasing(self.width, self.height, 'max')
+        crossed.draw_line(10, 100, 190, 100)
+        crossed.draw_line(100, 10, 100, 190, 0.3)
+        self.assertTrue(np.all(crossed.canvas >= single.canvas))
+        
+        with self.assertRaises(ValueError):
+            WuAntialiasing(10, 10, 'multiply')
+    
+    def test_tiled_renderer(self):
+        """测试分块并行渲染：图块拼接无接缝，结果与单进程批量绘制逐位相同"""
+        from tiled_renderer import TiledWuAntialiasing
+        
+        rng = np.random.default_rng(3)
+        starts = rng.uniform(-20, 220, (600, 2))
+        segments = np.hstack((starts, starts + rng.uniform(-60, 60, (600, 2))))
+        segments[:40] = rng.uniform(-150, 350, (40, 4))   # 穿过多个图块的长线段，图块内从中途开始
+        segments[40:45, 2:] = segments[40:45, :2]          # 单点
+        colors = rng.uniform(0.2, 1.0, len(segments))
+        
+        for mode in ('replace', 'max', 'over'):
+            expected = WuAntialiasing(self.width, self.height, mode)
+            expected.draw_lines(segments, colors)
+            with TiledWuAntialiasing(self.width, self.height, mode, tile_size=48, workers=2) as tiled:
+                tiled.draw_lines(segments, colors)
+                np.testing.assert_array_equal(
+                    tiled.canvas.view(np.uint32), expected.canvas.view(np.uint32)
+                )
+        
+        # 没有 close() 的画布被回收时删除共享内存
+        tiled = TiledWuAntialiasing(self.width, self.height, tile_size=48, workers=2)
+        tiled.draw_lines(segments, colors)
+        name = tiled._shm.name
+        del tiled
+        gc.collect()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+    
+    def test_canvas_backends(self):
+        """测试 float16 / uint8 画布、memmap 画布、只读视图与逐块保存 PNG"""
+        segments = np.random.default_rng(4).uniform(-20, 220, (300, 4))
+        self.wu.draw_lines(segments, 0.7)
+        
+        for dtype, tolerance in ((np.float16, 1e-3), (np.uint8, 0.5 / 255 + 1e-6)):
+            wu = WuAntialiasing(self.width, self.height, dtype=dtype)
+            wu.draw_lines(segments, 0.7)
+            self.assertEqual(wu.canvas.dtype, dtype)
+            np.testing.assert_allclose(wu.get_brightness(), self.wu.canvas, atol=tolerance)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            wu = WuAntialiasing(self.width, self.height, dtype=np.uint8,
+                                filename=os.path.join(tmp, "canvas.dat"))
+            self.assertIsInstance(wu.canvas, np.memmap)
+            wu.draw_lines(segments, 0.7)
+            wu.flush()
+            
+            # get_canvas 返回只读视图，不复制
+            view = wu.get_canvas()
+            self.assertFalse(view.flags.writeable)
+            self.assertTrue(np.shares_memory(view, wu.canvas))
+            with self.assertRaises(ValueError):
+                view[0, 0] = 1
+            
+            # 逐块写出的 PNG 与画布一致（第 0 行在图像底部）
+            path = os.path.join(tmp, "canvas.png")
+            wu.save_png(path, rows_per_chunk=7)
+            image = plt.imread(path)
+            self.assertEqual(image.shape, (self.height, self.width))
+            np.testing.assert_array_equal(np.rint(image * 255).astype(np.uint8), view[::-1])
+            del view, wu
+        
+        with self.assertRaises(ValueError):
+            WuAntialiasing(10, 10, dtype=np.int32)
 
 
 def run_comparison_test():
@@ -4,24 +4,70 @@ Wu反走样算法是一种用于绘制平滑直线的算法，通过计算像素
 """
 
 import math
+import struct
+import zlib
 import numpy as np
-from typing import Tuple, List
+from typing import Tuple, List, Optional
+
+
+# 中间部分像素数少于该值时逐像素绘制，避免 NumPy 的调用开销超过循环本身
+VECTORIZE_MIN_SPAN = 8
+
+# 像素合成方式（新亮度 v 写入已有亮度 c 的像素）：
+#   replace : c = v（后画的覆盖先画的）
+#   max     : c = max(c, v)
+#   add     : c = min(1, c + v)
+#   over    : c = v + c * (1 - v)（线条视为白色，不透明度为 覆盖度×颜色强度）
+COMPOSITE_MODES = ('replace', 'max', 'add', 'over')
+
+# 画布的存储类型：uint8 按 亮度×255 四舍五入存储
+CANVAS_DTYPES = (np.dtype(np.float32), np.dtype(np.float16), np.dtype(np.uint8))
+
+# draw_lines 每批光栅化的像素写入次数（估计值）上限，临时数组的大小与画布大小、线段总数无关
+DRAW_BATCH_WRITES = 1 << 21
 
 
 class WuAntialiasing:
     """Wu反走样算法类"""
     
-    def __init__(self, width: int, height: int):
+    # uint8 画布按 亮度×255 存储
+    _quantized = False
+    
+    def __init__(self, width: int, height: int, mode: str = 'replace',
+                 dtype=np.float32, filename: Optional[str] = None):
         """
         初始化画布
         
         Args:
             width: 画布宽度
             height: 画布高度
+            mode: 像素合成方式，见 COMPOSITE_MODES
+            dtype: 画布存储类型，float32（默认）、float16 或 uint8
+            filename: 指定时画布为该文件上的 numpy.memmap（新建，初始为 0），
+                      可以大于内存，由操作系统按需换入换出
         """
+        dtype = np.dtype(dtype)
+        if dtype not in CANVAS_DTYPES:
+            raise ValueError(f"不支持的画布类型: {dtype}，可选: float32, float16, uint8")
         self.width = width
         self.height = height
-        self.canvas = np.zeros((height, width), dtype=np.float32)
+        if filename is None:
+            self.canvas = np.zeros((height, width), dtype=dtype)
+        else:
+            self.canvas = np.memmap(filename, dtype=dtype, mode='w+', shape=(height, width))
+        self._quantized = dtype == np.uint8
+        self.set_mode(mode)
+    
+    def set_mode(self, mode: str):
+        """
+        设置像素合成方式
+        
+        Args:
+            mode: 'replace'、'max'、'add' 或 'over'
+        """
+        if mode not in COMPOSITE_MODES:
+            raise ValueError(f"未知的合成方式: {mode}，可选: {', '.join(COMPOSITE_MODES)}")
+        self.mode = mode
     
     def _fpart(self, x: float) -> float:
         """获取浮点数的小数部分"""
@@ -41,7 +87,71 @@ class WuAntialiasing:
             brightness: 亮度值 (0.0-1.0)
         """
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.canvas[y, x] = min(1.0, max(0.0, brightness))
+            value = min(1.0, max(0.0, brightness))
+            if self.mode != 'replace':
+                current = float(self.canvas[y, x])
+                if self._quantized:
+                    current /= 255
+                if self.mode == 'max':
+                    value = max(current, value)
+                elif self.mode == 'add':
+                    value = min(1.0, current + value)
+                else:
+                    value = min(1.0, value + current * (1 - value))
+            self.canvas[y, x] = round(value * 255) if self._quantized else value
+    
+    def _plot_array(self, xs: np.ndarray, ys: np.ndarray, brightness: np.ndarray):
+        """
+        批量绘制像素（_plot 的向量化版本），坐标两两不同
+        
+        Args:
+            xs: x坐标数组
+            ys: y坐标数组
+            brightness: 亮度数组
+        """
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        values = np.minimum(1.0, np.maximum(0.0, brightness[inside]))
+        self._composite(ys[inside] * self.width + xs[inside], values, unique=True)
+    
+    def _composite(self, index: np.ndarray, values: np.ndarray, unique: bool = False):
+        """按当前合成方式把亮度写入画布（index 为展平后的像素下标，values 已截断到 [0, 1]）"""
+        composite(self.canvas.reshape(-1), index, values, self.mode, unique)
+    
+    def _draw_span(self, start: int, stop: int, inter: float, gradient: float, color: float, x_major: bool):
+        """
+        绘制直线的中间部分：主方向坐标 start..stop-1，副方向交点从 inter 开始每步加 gradient
+        交点用 np.add.accumulate 按顺序累加，舍入过程与逐像素循环中的 inter += gradient 完全相同，
+        结果与逐像素绘制逐位一致
+        """
+        count = stop - start
+        if count <= 0:
+            return
+        if count < VECTORIZE_MIN_SPAN:
+            for major in range(start, stop):
+                minor = int(inter)
+                if x_major:
+                    self._plot(major, minor, self._rfpart(inter) * color)
+                    self._plot(major, minor + 1, self._fpart(inter) * color)
+                else:
+                    self._plot(minor, major, self._rfpart(inter) * color)
+                    self._plot(minor + 1, major, self._fpart(inter) * color)
+                inter += gradient
+            return
+        
+        steps = np.full(count, gradient)
+        steps[0] = inter
+        inters = np.add.accumulate(steps)
+        fpart = inters - np.floor(inters)
+        
+        major = np.arange(start, stop)
+        minor = inters.astype(np.int64)  # 与 int() 相同，向零取整
+        majors = np.concatenate((major, major))
+        minors = np.concatenate((minor, minor + 1))
+        brightness = np.concatenate(((1 - fpart) * color, fpart * color))
+        if x_major:
+            self._plot_array(majors, minors, brightness)
+        else:
+            self._plot_array(minors, majors, brightness)
     
     def draw_line(self, x0: float, y0: float, x1: float, y1: float, color: float = 1.0):
         """
@@ -96,10 +206,7 @@ class WuAntialiasing:
             self._plot(xpxl2, ypxl2 + 1, self._fpart(yend) * xgap * color)
             
             # 绘制中间部分
-            for x in range(xpxl1 + 1, xpxl2):
-                self._plot(x, int(intery), self._rfpart(intery) * color)
-                self._plot(x, int(intery) + 1, self._fpart(intery) * color)
-                intery += gradient
+            self._draw_span(xpxl1 + 1, xpxl2, intery, gradient, color, x_major=True)
         else:
             # y方向为主方向
             if y0 > y1:
@@ -132,18 +239,91 @@ class WuAntialiasing:
             self._plot(xpxl2 + 1, ypxl2, self._fpart(xend) * ygap * color)
             
             # 绘制中间部分
-            for y in range(ypxl1 + 1, ypxl2):
-                self._plot(int(interx), y, self._rfpart(interx) * color)
-                self._plot(int(interx) + 1, y, self._fpart(interx) * color)
-                interx += gradient
+            self._draw_span(ypxl1 + 1, ypxl2, interx, gradient, color, x_major=False)
+    
+    def draw_lines(self, segments: np.ndarray, colors=1.0):
+        """
+        批量绘制线段，所有线段一次向量化光栅化
+        replace、max、over 方式下结果与按顺序逐条调用 draw_line 逐位相同；
+        add 方式先在 float64 中求和再截断，与逐次截断的结果可能有舍入差异
+        
+        Args:
+            segments: 形状为 (N, 4) 的数组，每行为 x0, y0, x1, y1
+            colors: 颜色强度，标量或长度为 N 的数组
+        """
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        colors = np.broadcast_to(np.asarray(colors, dtype=np.float64), (len(segments),))
+        # 按估计的写入次数（每条线段约 2×主方向长度）分批光栅化，临时数组大小有上限
+        x0, y0, x1, y1 = segments.T
+        bounds = batch_bounds(2 * np.maximum(np.abs(x1 - x0), np.abs(y1 - y0)) + 6)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            xs, ys, brightness = rasterize_lines(segments[start:stop], colors[start:stop])
+            inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+            index = ys[inside] * self.width + xs[inside]
+            brightness = np.minimum(1.0, np.maximum(0.0, brightness[inside]))
+            self._composite(index, brightness)
     
     def clear(self):
         """清空画布"""
         self.canvas.fill(0.0)
     
     def get_canvas(self) -> np.ndarray:
-        """获取画布数据"""
-        return self.canvas.copy()
+        """获取画布数据（只读视图，不复制；需要修改时请自行 copy()）"""
+        view = np.asarray(self.canvas).view()
+        view.flags.writeable = False
+        return view
+    
+    def get_brightness(self, y0: int = 0, y1: Optional[int] = None) -> np.ndarray:
+        """
+        获取第 y0..y1-1 行的亮度（float32，0.0-1.0），uint8 画布换算为亮度
+        
+        Args:
+            y0: 起始行
+            y1: 结束行（不含），默认为画布高度
+        """
+        rows = self.canvas[y0:y1]
+        if self._quantized:
+            return rows.astype(np.float32) / 255
+        return rows.astype(np.float32)
+    
+    def flush(self):
+        """把 memmap 画布的修改写回文件（内存画布无操作）"""
+        if isinstance(self.canvas, np.memmap):
+            self.canvas.flush()
+    
+    def save_png(self, filename: str, rows_per_chunk: int = 256):
+        """
+        以 8 位灰度 PNG 格式逐块保存画布，不把整幅图像读入内存
+        方向与 save_image 相同（第 0 行在图像底部）
+        
+        Args:
+            filename: 文件名
+            rows_per_chunk: 每次读取、压缩的行数
+        """
+        def chunk(f, kind: bytes, data: bytes):
+            f.write(struct.pack('>I', len(data)))
+            f.write(kind)
+            f.write(data)
+            f.write(struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF))
+        
+        with open(filename, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+            chunk(f, b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 8, 0, 0, 0, 0))
+            
+            compressor = zlib.compressobj(6)
+            for stop in range(self.height, 0, -rows_per_chunk):
+                start = max(0, stop - rows_per_chunk)
+                rows = self.canvas[start:stop]
+                if not self._quantized:
+                    rows = np.rint(np.clip(rows, 0.0, 1.0) * 255).astype(np.uint8)
+                # 每行前加过滤类型字节 0，行从上到下即画布从最后一行到第 0 行
+                scanlines = np.zeros((stop - start, self.width + 1), dtype=np.uint8)
+                scanlines[:, 1:] = rows[::-1]
+                data = compressor.compress(scanlines.tobytes())
+                if data:
+                    chunk(f, b'IDAT', data)
+            chunk(f, b'IDAT', compressor.flush())
+            chunk(f, b'IEND', b'')
     
     def save_image(self, filename: str):
         """
@@ -155,7 +335,7 @@ class WuAntialiasing:
         import matplotlib.pyplot as plt
         
         plt.figure(figsize=(10, 8))
-        plt.imshow(self.canvas, cmap='gray', origin='lower')
+        plt.imshow(self.get_brightness(), cmap='gray', origin='lower')
         plt.colorbar()
         plt.title('Wu反走样算法结果')
         plt.xlabel('X坐标')
@@ -175,11 +355,13 @@ def draw_circle_points(wu: WuAntialiasing, center_x: float, center_y: float, rad
         radius: 半径
         num_points: 点的数量
     """
+    segments = []
     for i in range(num_points):
         angle = 2 * math.pi * i / num_points
         x = center_x + radius * math.cos(angle)
         y = center_y + radius * math.sin(angle)
-        wu.draw_line(center_x, center_y, x, y, 0.8)
+        segments.append((center_x, center_y, x, y))
+    wu.draw_lines(np.array(segments), 0.8)
 
 
 def draw_star(wu: WuAntialiasing, center_x: float, center_y: float, outer_radius: float, inner_radius: float, num_points: int = 5):
@@ -206,7 +388,356 @@ def draw_star(wu: WuAntialiasing, center_x: float, center_y: float, outer_radius
         points.append((x, y))
     
     # 连接所有点形成星形
-    for i in range(len(points)):
-        x0, y0 = points[i]
-        x1, y1 = points[(i + 1) % len(points)]
-        wu.draw_line(x0, y0, x1, y1, 0.9)
+    starts = np.array(points)
+    ends = np.roll(starts, -1, axis=0)
+    wu.draw_lines(np.hstack((starts, ends)), 0.9)
+
+
+def _last_writes(index: np.ndarray) -> np.ndarray:
+    """同一位置被多次写入时只保留最后一次，返回保留的写入下标（升序）"""
+    count = len(index)
+    if count == 0:
+        return np.empty(0, dtype=np.int64)
+    low = index.min()
+    span = int(index.max() - low) + 1
+    if span <= 4 * count:
+        # 写入较密集：按位置记录最后的写入序号，比排序快
+        order = np.arange(count, dtype=np.int64)
+        stamp = np.full(span, -1, dtype=np.int64)
+        np.maximum.at(stamp, index - low, order)
+        return np.flatnonzero(stamp[index - low] == order)
+    # 写入稀疏：在逆序中取每个位置第一次出现的下标
+    _, last = np.unique(index[::-1], return_index=True)
+    return np.sort(count - 1 - last)
+
+
+def composite(canvas: np.ndarray, index: np.ndarray, values: np.ndarray, mode: str, unique: bool = False):
+    """
+    按合成方式把一组写入合成到一维画布 canvas 上（按写入顺序）
+    同一像素被多次写入时：
+        replace : 只保留最后一次写入
+        max     : np.maximum.at，与写入顺序无关
+        add     : 先用 bincount 按像素求和（按写入顺序累加，结果确定），再一次加到画布上
+        over    : 按每个像素的第几次写入分轮处理，每轮内像素不重复，与逐次写入逐位相同
+    
+    Args:
+        canvas: 一维画布（可以是二维画布的 reshape(-1) 视图），uint8 画布按 亮度×255 存储
+        index: 像素下标
+        values: 亮度，已截断到 [0, 1]
+        mode: 合成方式，见 COMPOSITE_MODES
+        unique: index 中没有重复下标时为 True，可跳过分组
+    """
+    quantized = canvas.dtype == np.uint8
+    
+    def load(index):
+        return canvas[index] / 255 if quantized else canvas[index]
+    
+    def store(index, values):
+        canvas[index] = np.rint(values * 255) if quantized else values
+    
+    if mode == 'replace':
+        if not unique:
+            keep = _last_writes(index)
+            index = index[keep]
+            values = values[keep]
+        store(index, values)
+    elif mode == 'max':
+        if quantized:
+            values = np.rint(values * 255)
+        if unique:
+            canvas[index] = np.maximum(canvas[index], values)
+        else:
+            np.maximum.at(canvas, index, values.astype(canvas.dtype))
+    elif mode == 'add':
+        if not unique:
+            index, values = _sum_writes(index, values)
+        store(index, np.minimum(1.0, load(index) + values))
+    else:
+        rounds = [(index, values)] if unique else _write_rounds(index, values)
+        for index, values in rounds:
+            store(index, np.minimum(1.0, values + load(index) * (1 - values)))
+
+
+def _group_writes(index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按像素分组：返回 (不重复的像素下标（升序）, 每次写入所属的组号)
+    写入较密集时用计数表代替排序
+    """
+    if len(index) == 0:
+        return index, np.empty(0, dtype=np.int64)
+    low = index.min()
+    span = int(index.max() - low) + 1
+    if span <= 4 * len(index):
+        present = np.bincount(index - low, minlength=span) > 0
+        group = np.cumsum(present) - 1
+        return np.flatnonzero(present) + low, group[index - low]
+    return np.unique(index, return_inverse=True)
+
+
+def _sum_writes(index: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """按像素对写入的亮度求和，返回 (像素下标, 亮度和)"""
+    pixels, group = _group_writes(index)
+    return pixels, np.bincount(group, weights=values, minlength=len(pixels))
+
+
+def _write_rounds(index: np.ndarray, values: np.ndarray):
+    """
+    按“该像素的第几次写入”把写入分轮，依次产生 (像素下标, 亮度)
+    每轮内像素不重复；轮次顺序与每个像素的写入顺序一致
+    """
+    count = len(index)
+    if count == 0:
+        return
+    order = np.argsort(index, kind='stable')
+    sorted_index = index[order]
+    run_start = np.empty(count, dtype=bool)
+    run_start[0] = True
+    run_start[1:] = sorted_index[1:] != sorted_index[:-1]
+    position = np.arange(count)
+    rank = np.empty(count, dtype=np.int64)
+    rank[order] = position - np.maximum.accumulate(np.where(run_start, position, 0))
+    
+    by_rank = np.argsort(rank, kind='stable')
+    bounds = np.cumsum(np.bincount(rank))
+    start = 0
+    for stop in bounds:
+        writes = by_rank[start:stop]
+        yield index[writes], values[writes]
+        start = stop
+
+
+def batch_bounds(cost: np.ndarray, limit: int = DRAW_BATCH_WRITES) -> np.ndarray:
+    """
+    按累计代价把 [0, N) 切分为若干批，每批的代价约为 limit（单个元素超过 limit 时单独成批）
+    
+    Returns:
+        边界数组，第 i 批为 [bounds[i], bounds[i + 1])
+    """
+    total = np.cumsum(cost)
+    last = total[-1] if len(total) else 0
+    cuts = np.searchsorted(total, np.arange(limit, last, limit))
+    return np.unique(np.r_[0, cuts, len(total)])
+
+
+def line_geometry(segments: np.ndarray):
+    """
+    计算线段在主方向上的参数，与 draw_line 的计算逐位相同
+    线段按主方向统一处理：x 方向为主时主坐标 a 为 x、副坐标 b 为 y，否则相反，并使主坐标递增
+    
+    Returns:
+        (point, steep, apx1, bpx1, apx2, bpx2, first, second, inter, gradient, lengths)
+        point / steep 为单点、y 方向为主的掩码；(apx, bpx) 为两个端点的像素；
+        first / second 为两个端点各两个像素的覆盖度（未乘颜色强度）；
+        inter 为中间部分第 0 步的交点，lengths 为中间部分的步数（单点为 0）
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    x0, y0, x1, y1 = segments.T
+    dx = x1 - x0
+    dy = y1 - y0
+    
+    point = (np.abs(dx) < 1e-6) & (np.abs(dy) < 1e-6)
+    steep = ~(np.abs(dx) > np.abs(dy))
+    
+    # 转换为 (主坐标, 副坐标)，并使主坐标递增
+    a0 = np.where(steep, y0, x0)
+    b0 = np.where(steep, x0, y0)
+    a1 = np.where(steep, y1, x1)
+    b1 = np.where(steep, x1, y1)
+    swap = a0 > a1
+    a0, a1 = np.where(swap, a1, a0), np.where(swap, a0, a1)
+    b0, b1 = np.where(swap, b1, b0), np.where(swap, b0, b1)
+    da = a1 - a0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gradient = np.where(da != 0, (b1 - b0) / da, 0.0)
+    
+    # 第一个端点
+    aend = np.round(a0)
+    bend = b0 + gradient * (aend - a0)
+    gap = a0 + 0.5
+    gap = 1 - (gap - np.floor(gap))
+    apx1 = aend.astype(np.int64)
+    bpx1 = bend.astype(np.int64)
+    fpart = bend - np.floor(bend)
+    first = ((1 - fpart) * gap, fpart * gap)
+    inter = bend + gradient
+    
+    # 第二个端点（y 方向为主时沿用 draw_line 中以 y1 为基准的计算）
+    aend = np.round(a1)
+    bend = np.where(steep, a1, b1) + gradient * (aend - a1)
+    gap = a1 + 0.5
+    gap = gap - np.floor(gap)
+    apx2 = aend.astype(np.int64)
+    bpx2 = bend.astype(np.int64)
+    fpart = bend - np.floor(bend)
+    second = ((1 - fpart) * gap, fpart * gap)
+    
+    lengths = np.where(point, 0, np.maximum(apx2 - apx1 - 1, 0))
+    return point, steep, apx1, bpx1, apx2, bpx2, first, second, inter, gradient, lengths
+
+
+def clip_steps(steep: np.ndarray, apx1: np.ndarray, inter: np.ndarray, gradient: np.ndarray,
+               lengths: np.ndarray, rect) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    中间部分可能写入矩形 rect 内像素的步数范围 [k0, k1)（保守估计，参数见 line_geometry）
+    主方向按矩形边界精确截取；副方向按 inter + k × gradient 估计交点，留 2 像素余量
+    
+    Args:
+        rect: (x0, y0, x1, y1)，不含 x1、y1；各项可以是标量或与线段一一对应的数组
+    """
+    rx0, ry0, rx1, ry1 = rect
+    a_lo = np.where(steep, ry0, rx0)
+    a_hi = np.where(steep, ry1, rx1)
+    b_lo = np.where(steep, rx0, ry0) - 2
+    b_hi = np.where(steep, rx1, ry1) + 2
+    
+    flat = gradient == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ka = (b_lo - inter) / gradient
+        kb = (b_hi - inter) / gradient
+    crossing = (inter >= b_lo) & (inter < b_hi)
+    kmin = np.where(flat, np.where(crossing, -np.inf, np.inf), np.floor(np.minimum(ka, kb)) - 1)
+    kmax = np.where(flat, np.where(crossing, np.inf, -np.inf), np.ceil(np.maximum(ka, kb)) + 2)
+    
+    k0 = np.clip(np.maximum(a_lo - apx1 - 1, kmin), 0, lengths).astype(np.int64)
+    k1 = np.clip(np.minimum(a_hi - apx1 - 1, kmax), 0, lengths).astype(np.int64)
+    return k0, np.maximum(k1, k0)
+
+
+def _accumulate_inters(inter: np.ndarray, gradient: np.ndarray,
+                       lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    交点序列：第 i 条线段从 inter[i] 开始每步加 gradient[i]，共 lengths[i] 个值，
+    舍入过程与 draw_line 中的逐步累加一致
+    
+    较短的线段按步推进：第 k 步只对长度超过 k 的线段累加一次 gradient；
+    最长的少数线段则像 _draw_span 那样逐条用 np.add.accumulate 累加，
+    使循环次数不由单条长线段决定
+    
+    Returns:
+        (inters, start)：第 i 条线段的交点为 inters[start[i]:start[i] + lengths[i]]
+    """
+    start = np.cumsum(lengths) - lengths
+    inters = np.empty(int(lengths.sum()), dtype=np.float64)
+    order = np.argsort(-lengths, kind='stable')
+    order = order[lengths[order] > 0]
+    if not len(order):
+        return inters, start
+    
+    # 前 split 条逐条累加，其余按步推进（步数为第 split 条的长度）；取使循环次数之和最小的 split
+    span = lengths[order]
+    split = int(np.argmin(np.arange(len(span) + 1) + np.r_[span, 0]))
+    for i, segment in enumerate(order[:split]):
+        steps = np.full(span[i], gradient[segment])
+        steps[0] = inter[segment]
+        np.add.accumulate(steps, out=inters[start[segment]:start[segment] + span[i]])
+    
+    if split < len(order):
+        rest = start[order[split:]]
+        current = inter[order[split:]]
+        step = gradient[order[split:]]
+        alive_counts = np.searchsorted(-span[split:], -np.arange(span[split]), side='left')
+        for k, alive in enumerate(alive_counts):
+            inters[rest[:alive] + k] = current[:alive]
+            current[:alive] += step[:alive]
+    return inters, start
+
+
+def inters_at(segments: np.ndarray, index: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """
+    第 index[j] 条线段中间部分第 steps[j] 步的交点，与 draw_line 中逐步累加的结果逐位相同
+    同一条线段的多个步数只累加一次（到其中最大的步数）
+    """
+    geometry = line_geometry(segments)
+    inter, gradient = geometry[8], geometry[9]
+    index = np.asarray(index, dtype=np.int64)
+    steps = np.asarray(steps, dtype=np.int64)
+    need = np.zeros(len(inter), dtype=np.int64)
+    np.maximum.at(need, index, steps + 1)
+    inters, start = _accumulate_inters(inter, gradient, need)
+    return inters[start[index] + steps]
+
+
+def rasterize_lines(segments: np.ndarray, colors=1.0, clip=None,
+                    seeds: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    把多条线段一次光栅化为像素写入序列（不截断亮度），与 draw_line 的计算逐位相同
+    
+    Args:
+        segments: 形状为 (N, 4) 的数组，每行为 x0, y0, x1, y1
+        colors: 颜色强度，标量或长度为 N 的数组
+        clip: 矩形 (x0, y0, x1, y1)；给出时中间部分只生成 clip_steps 范围内的写入
+              （端点仍全部生成，调用者按矩形过滤），分块绘制时每个图块只光栅化线段经过它的部分
+        seeds: 与 clip 一起使用，seeds[i] 为第 i 条线段在矩形内第一步 k0 的交点（由 inters_at 求出），
+               k0 为 0 的线段忽略；省略时从线段起点累加求出
+    
+    Returns:
+        (xs, ys, brightness)：按逐条调用 draw_line 时的写入顺序排列
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    n = len(segments)
+    colors = np.broadcast_to(np.asarray(colors, dtype=np.float64), (n,))
+    point, steep, apx1, bpx1, apx2, bpx2, first, second, inter, gradient, lengths = line_geometry(segments)
+    
+    if clip is None:
+        k0 = np.zeros(n, dtype=np.int64)
+        k1 = lengths
+        begin = inter
+    else:
+        k0, k1 = clip_steps(steep, apx1, inter, gradient, lengths, clip)
+        later = k0 > 0
+        if seeds is None:
+            seeds = np.zeros(n)
+            index = np.flatnonzero(later)
+            if len(index):
+                prefix, start = _accumulate_inters(inter, gradient, np.where(later, k0 + 1, 0))
+                seeds[index] = prefix[start[index] + k0[index]]
+        begin = np.where(later, seeds, inter)
+    
+    # 每条线段的写入次数：单点 1 次，否则端点 4 次 + 中间部分每步 2 次
+    count = k1 - k0
+    writes = np.where(point, 1, 4 + 2 * count)
+    base = np.cumsum(writes) - writes
+    total = int(writes.sum())
+    xs = np.empty(total, dtype=np.int64)
+    ys = np.empty(total, dtype=np.int64)
+    brightness = np.empty(total, dtype=np.float64)
+    
+    # 单点
+    pos = base[point]
+    xs[pos] = np.round(segments[point, 0]).astype(np.int64)
+    ys[pos] = np.round(segments[point, 1]).astype(np.int64)
+    brightness[pos] = colors[point]
+    
+    # 端点：写入顺序为 (a1, b1), (a1, b1+1), (a2, b2), (a2, b2+1)
+    line = ~point
+    pos = base[line]
+    is_steep = steep[line]
+    for offset, (a, b, coverage) in enumerate((
+        (apx1, bpx1, first[0]), (apx1, bpx1 + 1, first[1]),
+        (apx2, bpx2, second[0]), (apx2, bpx2 + 1, second[1]),
+    )):
+        a = a[line]
+        b = b[line]
+        xs[pos + offset] = np.where(is_steep, b, a)
+        ys[pos + offset] = np.where(is_steep, a, b)
+        brightness[pos + offset] = coverage[line] * colors[line]
+    
+    # 中间部分：第 k0..k1-1 步
+    inters, start = _accumulate_inters(begin, gradient, count)
+    if len(inters):
+        owner = np.repeat(np.arange(n), count)
+        local = np.arange(len(inters)) - start[owner]
+        a = apx1[owner] + 1 + k0[owner] + local
+        b = inters.astype(np.int64)  # 与 int() 相同，向零取整
+        fpart = inters - np.floor(inters)
+        color = colors[owner]
+        pos = base[owner] + 4 + 2 * local
+        is_steep = steep[owner]
+        xs[pos] = np.where(is_steep, b, a)
+        ys[pos] = np.where(is_steep, a, b)
+        brightness[pos] = (1 - fpart) * color
+        xs[pos + 1] = np.where(is_steep, b + 1, a)
+        ys[pos + 1] = np.where(is_steep, a, b + 1)
+        brightness[pos + 1] = fpart * color
+    
+    return xs, ys, brightness
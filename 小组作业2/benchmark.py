@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LL(1) 构造过程基准测试
+用 grammar_generator 生成不同规模的随机 LL(1) 文法，分别计时：
+    载入文法 / FIRST / FOLLOW / SELECT / 预测分析表 / 句子分析
+并给出相邻规模之间的增长指数（log(t2/t1) / log(n2/n1)），用于衡量算法改进效果。
+
+用法：
+    python3 benchmark.py
+    python3 benchmark.py --sizes 50 100 200 400 --alternatives 4 --nullable 0.4
+"""
+
+import argparse
+import math
+import time
+from typing import Dict, List
+
+from grammar_generator import generate_grammar, generate_sentence
+from ll1_parser import LL1ParserManual
+
+
+PHASES = ['载入', 'FIRST', 'FOLLOW', 'SELECT', '分析表', '句子分析']
+
+
+def run_once(num_nonterminals: int, args) -> Dict[str, float]:
+    """对一个规模做一次完整测量，返回各阶段耗时（秒）"""
+    spec = generate_grammar(num_nonterminals=num_nonterminals,
+                            max_alternatives=args.alternatives,
+                            nullable_density=args.nullable,
+                            max_rhs_length=args.rhs_length,
+                            seed=args.seed)
+    sentence = generate_sentence(spec, target_length=args.sentence_length, seed=args.seed)
+
+    timings: Dict[str, float] = {}
+    clock = time.perf_counter
+
+    t = clock()
+    parser = LL1ParserManual()
+    parser.load_grammar(spec.grammar, spec.start_symbol)
+    timings['载入'] = clock() - t
+
+    t = clock()
+    parser.compute_first_sets()
+    timings['FIRST'] = clock() - t
+
+    t = clock()
+    parser.compute_follow_sets()
+    timings['FOLLOW'] = clock() - t
+
+    t = clock()
+    parser.compute_select_sets()
+    timings['SELECT'] = clock() - t
+
+    t = clock()
+    parser.build_predict_table()
+    timings['分析表'] = clock() - t
+
+    t = clock()
+    ok, _, _ = parser.analyze_with_recovery(sentence, record_steps=False)
+    timings['句子分析'] = clock() - t
+
+    if not ok:
+        raise RuntimeError(f"规模 {num_nonterminals}：生成的句子未被接受")
+    timings['产生式数'] = spec.production_count
+    return timings
+
+
+def run_benchmark(args) -> List[Dict[str, float]]:
+    rows = []
+    for n in args.sizes:
+        # 多次重复取最小值，减少偶然抖动
+        best = None
+        for _ in range(args.repeat):
+            timings = run_once(n, args)
+            if best is None:
+                best = timings
+            else:
+                best = {k: min(best[k], timings[k]) for k in best}
+        best['规模'] = n
+        rows.append(best)
+    return rows
+
+
+def print_report(rows: List[Dict[str, float]]):
+    header = f"{'非终结符':>8} {'产生式':>8} " + ' '.join(f"{p:>10}" for p in PHASES)
+    print("各阶段耗时（毫秒）：")
+    print(header)
+    print('-' * len(header))
+    for row in rows:
+        print(f"{int(row['规模']):>10} {int(row['产生式数']):>9} "
+              + ' '.join(f"{row[p] * 1000:>12.2f}" for p in PHASES))
+
+    if len(rows) < 2:
+        return
+
+    # 增长指数：以产生式数为规模，约 1 为线性、约 2 为平方
+    print("\n增长指数 log(t2/t1) / log(n2/n1)：")
+    print(header)
+    print('-' * len(header))
+    for prev, cur in zip(rows, rows[1:]):
+        ratio_n = cur['产生式数'] / prev['产生式数']
+        cells = []
+        for p in PHASES:
+            if prev[p] > 0 and cur[p] > 0 and ratio_n > 1:
+                cells.append(f"{math.log(cur[p] / prev[p]) / math.log(ratio_n):>12.2f}")
+            else:
+                cells.append(f"{'-':>12}")
+        print(f"{int(cur['规模']):>10} {int(cur['产生式数']):>9} " + ' '.join(cells))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="LL(1) 构造过程基准测试")
+    ap.add_argument('--sizes', type=int, nargs='+', default=[25, 50, 100, 200, 400],
+                    help="非终结符个数（可给出多个规模）")
+    ap.add_argument('--alternatives', type=int, default=3, help="每个非终结符的最多候选式个数")
+    ap.add_argument('--nullable', type=float, default=0.3, help="非终结符可空的概率")
+    ap.add_argument('--rhs-length', type=int, default=4, help="右部最大长度")
+    ap.add_argument('--sentence-length', type=int, default=2000, help="测试句子的目标长度")
+    ap.add_argument('--repeat', type=int, default=3, help="每个规模重复次数（取最小值）")
+    ap.add_argument('--seed', type=int, default=2024, help="随机种子")
+    args = ap.parse_args()
+
+    print_report(run_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+随机 LL(1) 文法与句子生成器
+用于给 FIRST / FOLLOW / SELECT / 预测分析表的构造过程做压力测试。
+
+构造方式保证生成的文法一定是 LL(1) 文法：
+    1. 非终结符 N0..N(n-1)，N0 为开始符号
+    2. 每个候选式以该候选式独占的终结符 tI_J 开头，FIRST 集合两两不相交
+    3. 可空的非终结符只有一条 ε 候选式，且它在右部中只能后接“公共终结符” aK
+       （公共终结符不会出现在任何候选式开头），或位于自身候选式的末尾（右递归），
+       因此 FOLLOW 与其它候选式的 FIRST 不相交
+    4. 右部只引用编号更大的非终结符或自身（右递归），不会出现左递归
+    5. 每个非终结符的最后一条候选式只含终结符（或为 ε），保证句子能随时收尾
+    6. 开始符号的第一条候选式总以自身结尾（右递归），因此可以生成任意长的句子
+"""
+
+import random
+from typing import Dict, List, Optional
+
+from ll1_parser import LL1ParserManual
+
+
+EPSILON = 'ε'
+
+
+class GrammarSpec:
+    """生成的文法：grammar 为 A -> [alpha1, alpha2, ...]，与 LL1ParserManual.grammar 同构"""
+
+    def __init__(self, grammar: Dict[str, List[List[str]]], start_symbol: str):
+        self.grammar = grammar
+        self.start_symbol = start_symbol
+
+    @property
+    def production_count(self) -> int:
+        return sum(len(prods) for prods in self.grammar.values())
+
+    def to_text(self) -> str:
+        """转换为 GUI / 示例文法.txt 使用的文本格式"""
+        lines = []
+        for left, prods in self.grammar.items():
+            lines.append(f"{left} → {' | '.join(' '.join(alpha) for alpha in prods)}")
+        return '\n'.join(lines)
+
+    def build_parser(self) -> LL1ParserManual:
+        """构造已载入该文法的 LL1ParserManual"""
+        parser = LL1ParserManual()
+        parser.load_grammar(self.grammar, self.start_symbol)
+        return parser
+
+
+def generate_grammar(num_nonterminals: int = 10, max_alternatives: int = 3,
+                     nullable_density: float = 0.3, max_rhs_length: int = 4,
+                     num_shared_terminals: int = 8, seed: Optional[int] = None) -> GrammarSpec:
+    """
+    生成随机 LL(1) 文法
+
+    Args:
+        num_nonterminals: 非终结符个数
+        max_alternatives: 每个非终结符的最多候选式个数（不含 ε）
+        nullable_density: 非终结符可空（带 ε 候选式）的概率
+        max_rhs_length: 右部最大长度
+        num_shared_terminals: 公共终结符个数
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    names = [f"N{i}" for i in range(num_nonterminals)]
+    shared = [f"a{k}" for k in range(max(1, num_shared_terminals))]
+    nullable = [i > 0 and rng.random() < nullable_density for i in range(num_nonterminals)]
+    # 开始符号也允许可空，它的 FOLLOW 只有 $
+    nullable[0] = num_nonterminals > 0 and rng.random() < nullable_density
+
+    grammar: Dict[str, List[List[str]]] = {}
+    for i, left in enumerate(names):
+        prods: List[List[str]] = []
+        # 开始符号至少两条候选式：一条右递归、一条用于收尾
+        count = rng.randint(2 if i == 0 else 1, max(2, max_alternatives) if i == 0 else max_alternatives)
+        for j in range(count):
+            alpha = [f"t{i}_{j}"]
+            last = j == count - 1
+            length = rng.randint(1, max_rhs_length)
+            while len(alpha) < length:
+                if last or rng.random() < 0.5:
+                    alpha.append(rng.choice(shared))
+                    continue
+                k = rng.randint(i, num_nonterminals - 1)
+                if k == i:
+                    # 右递归只能出现在末尾
+                    alpha.append(left)
+                    break
+                alpha.append(names[k])
+                if nullable[k]:
+                    # 可空非终结符后必须紧跟公共终结符
+                    alpha.append(rng.choice(shared))
+            if i == 0 and j == 0 and alpha[-1] != left and not last:
+                alpha.append(left)
+            prods.append(alpha)
+        if nullable[i]:
+            prods.append([EPSILON])
+        grammar[left] = prods
+
+    return GrammarSpec(grammar, names[0] if names else '')
+
+
+def _min_lengths(spec: GrammarSpec) -> Dict[str, int]:
+    """每个非终结符能推导出的最短句子长度（不动点迭代）"""
+    inf = float('inf')
+    best: Dict[str, float] = {A: inf for A in spec.grammar}
+    changed = True
+    while changed:
+        changed = False
+        for A, prods in spec.grammar.items():
+            for alpha in prods:
+                total = 0
+                for X in alpha:
+                    if X == EPSILON:
+                        continue
+                    total += best[X] if X in best else 1
+                if total < best[A]:
+                    best[A] = total
+                    changed = True
+    return {A: int(v) for A, v in best.items()}
+
+
+def generate_sentence(spec: GrammarSpec, target_length: int = 50,
+                      seed: Optional[int] = None) -> str:
+    """
+    从开始符号随机推导一个句子（空格分隔）
+    句子长度超过 target_length 后总是选择最短的候选式，尽快收尾。
+    使用显式栈做最左推导，不受递归深度限制。
+    """
+    rng = random.Random(seed)
+    min_len = _min_lengths(spec)
+    shortest = {}
+    # 尚未达到目标长度时，优先选择含非终结符的候选式，让句子继续增长
+    growing = {}
+    # 右递归候选式：待推导的只剩它时选用，避免句子过早结束
+    recursive = {}
+    for A, prods in spec.grammar.items():
+        shortest[A] = min(prods, key=lambda alpha: sum(
+            0 if X == EPSILON else min_len.get(X, 1) for X in alpha))
+        growing[A] = [alpha for alpha in prods
+                      if any(X in spec.grammar for X in alpha)] or prods
+        recursive[A] = [alpha for alpha in prods if alpha[-1] == A]
+
+    out: List[str] = []
+    stack: List[str] = [spec.start_symbol]
+    while stack:
+        X = stack.pop()
+        if X == EPSILON:
+            continue
+        if X not in spec.grammar:
+            out.append(X)
+            continue
+        if len(out) + len(stack) >= target_length:
+            alpha = shortest[X]
+        elif not stack and recursive[X]:
+            alpha = rng.choice(recursive[X])
+        else:
+            alpha = rng.choice(growing[X])
+        stack.extend(reversed(alpha))
+    return ' '.join(out)
+
+
+if __name__ == "__main__":
+    spec = generate_grammar(num_nonterminals=6, seed=1)
+    print(spec.to_text())
+    parser = spec.build_parser()
+    parser.build_predict_table()
+    print("冲突数：", len(parser.conflicts))
+    for s in range(3):
+        sentence = generate_sentence(spec, target_length=20, seed=s)
+        ok, _ = parser.analyze(sentence)
+        print("接受" if ok else "拒绝", ":", sentence)
@@ -3,10 +3,129 @@ LL(1)语法分析器图形化界面
 By Group2 邵昱铭 王宝飞 孙智博 肖宇航
 """
 
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 import tkinter.font as tkFont
 from ll1_parser import LL1ParserManual as LL1Parser, create_sample_grammar_manual as create_sample_grammar
+from grammar_reader import read_grammar
+
+
+class VirtualTable(ttk.Frame):
+    """
+    虚拟化表格：在 Canvas 上只绘制当前可见区域内的单元格。
+    单元格内容由 cell_text(行号, 列号) 按需生成，表格规模再大也只创建一屏的图元；
+    表头行与表头列随滚动固定在可视区域的上方和左侧。
+    """
+
+    def __init__(self, parent, font, cell_width=140, cell_height=22, header_width=100):
+        super().__init__(parent)
+        self.font = font
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.header_width = header_width
+
+        self.row_headers = []
+        self.col_headers = []
+        self.cell_text = lambda r, c: ""
+        self.cell_highlight = lambda r, c: False
+        self._redraw_pending = False
+
+        self.canvas = tk.Canvas(self, background='white', highlightthickness=0)
+        vsb = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        hsb = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.canvas.configure(
+            yscrollcommand=lambda *args: (vsb.set(*args), self._schedule_redraw()),
+            xscrollcommand=lambda *args: (hsb.set(*args), self._schedule_redraw())
+        )
+
+        self.canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.canvas.bind('<Configure>', lambda e: self._schedule_redraw())
+        self.canvas.bind('<MouseWheel>', self._on_mousewheel)
+        self.canvas.bind('<Shift-MouseWheel>', self._on_shift_mousewheel)
+        self.canvas.bind('<Button-4>', lambda e: self.canvas.yview_scroll(-3, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.canvas.yview_scroll(3, 'units'))
+
+    def set_data(self, row_headers, col_headers, cell_text, cell_highlight=None):
+        """设置行/列表头与单元格内容函数，并回到左上角"""
+        self.row_headers = row_headers
+        self.col_headers = col_headers
+        self.cell_text = cell_text
+        self.cell_highlight = cell_highlight or (lambda r, c: False)
+        width = self.header_width + len(col_headers) * self.cell_width
+        height = (len(row_headers) + 1) * self.cell_height
+        self.canvas.configure(scrollregion=(0, 0, width, height),
+                              xscrollincrement=self.cell_width,
+                              yscrollincrement=self.cell_height)
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+        self._schedule_redraw()
+
+    def clear(self):
+        self.set_data([], [], lambda r, c: "")
+
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, 'units')
+
+    def _on_shift_mousewheel(self, event):
+        self.canvas.xview_scroll(-1 if event.delta > 0 else 1, 'units')
+
+    def _schedule_redraw(self):
+        # 合并同一轮事件中的多次滚动，只重绘一次
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._redraw)
+
+    def _redraw(self):
+        self._redraw_pending = False
+        canvas = self.canvas
+        canvas.delete('all')
+        if not self.row_headers:
+            return
+
+        cw, ch, hw = self.cell_width, self.cell_height, self.header_width
+        left = canvas.canvasx(0)
+        top = canvas.canvasy(0)
+        view_w = canvas.winfo_width()
+        view_h = canvas.winfo_height()
+
+        first_col = max(0, int((left - hw) // cw))
+        last_col = min(len(self.col_headers), int((left + view_w - hw) // cw) + 1)
+        first_row = max(0, int((top - ch) // ch))
+        last_row = min(len(self.row_headers), int((top + view_h - ch) // ch) + 1)
+
+        # 单元格
+        for r in range(first_row, last_row):
+            y = ch + r * ch
+            for c in range(first_col, last_col):
+                x = hw + c * cw
+                fill = '#ffd6d6' if self.cell_highlight(r, c) else 'white'
+                canvas.create_rectangle(x, y, x + cw, y + ch, fill=fill, outline='#d0d0d0')
+                text = self.cell_text(r, c)
+                if text:
+                    canvas.create_text(x + 4, y + ch / 2, text=text, anchor=tk.W, font=self.font)
+
+        # 固定的表头列
+        for r in range(first_row, last_row):
+            y = ch + r * ch
+            canvas.create_rectangle(left, y, left + hw, y + ch, fill='#eeeeee', outline='#c0c0c0')
+            canvas.create_text(left + 4, y + ch / 2, text=self.row_headers[r],
+                               anchor=tk.W, font=self.font)
+
+        # 固定的表头行
+        for c in range(first_col, last_col):
+            x = hw + c * cw
+            canvas.create_rectangle(x, top, x + cw, top + ch, fill='#eeeeee', outline='#c0c0c0')
+            canvas.create_text(x + 4, top + ch / 2, text=self.col_headers[c],
+                               anchor=tk.W, font=self.font)
+        canvas.create_rectangle(left, top, left + hw, top + ch, fill='#e0e0e0', outline='#c0c0c0')
+        canvas.create_text(left + 4, top + ch / 2, text="非终结符", anchor=tk.W, font=self.font)
 
 
 class LL1ParserGUI:
@@ -17,6 +136,8 @@ class LL1ParserGUI:
         
         # 创建LL(1)分析器实例
         self.parser = LL1Parser()
+        # 正在计算分析表的工作线程（无则为 None）
+        self._compute_thread = None
         
         # 设置样式
         self.setup_styles()
@@ -88,10 +209,19 @@ class LL1ParserGUI:
                   command=self.load_from_file).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="解析文法", 
                   command=self.parse_grammar).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Button(button_frame, text="计算分析表", 
-                  command=self.compute_analysis_table).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="提取左公因子", 
+                  command=self.left_factor_grammar).pack(side=tk.LEFT, padx=(0, 10))
+        self.compute_button = ttk.Button(button_frame, text="计算分析表", 
+                                         command=self.compute_analysis_table)
+        self.compute_button.pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="清空", 
                   command=self.clear_grammar).pack(side=tk.LEFT)
+        
+        # 计算进度
+        self.progress_var = tk.StringVar(value="")
+        ttk.Label(button_frame, textvariable=self.progress_var).pack(side=tk.RIGHT)
+        self.progress_bar = ttk.Progressbar(button_frame, length=160, mode='determinate')
+        self.progress_bar.pack(side=tk.RIGHT, padx=(0, 10))
     
     def create_analysis_area(self, parent):
         """创建分析区域"""
@@ -114,6 +244,11 @@ class LL1ParserGUI:
         ttk.Button(input_frame, text="分析", 
                   command=self.analyze_input).grid(row=0, column=1)
         
+        # 错误恢复模式：出错后继续分析并收集全部错误
+        self.recovery_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="错误恢复",
+                        variable=self.recovery_var).grid(row=0, column=2, padx=(10, 0))
+        
         # 预设输入串
         ttk.Label(analysis_frame, text="预设输入串:").grid(row=2, column=0, sticky=tk.W, pady=(10, 5))
         
@@ -196,10 +331,14 @@ class LL1ParserGUI:
         self.table_frame = ttk.Frame(self.result_notebook)
         self.result_notebook.add(self.table_frame, text="预测分析表")
         
+        # 只绘制可见单元格的虚拟表格，下方显示冲突报告
+        self.table_view = VirtualTable(self.table_frame, font=self.mono_font)
+        self.table_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
         self.table_text = scrolledtext.ScrolledText(
-            self.table_frame, font=self.mono_font, wrap=tk.WORD
+            self.table_frame, font=self.mono_font, wrap=tk.WORD, height=8
         )
-        self.table_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.table_text.pack(fill=tk.X, padx=5, pady=(0, 5))
         
         # 文法信息标签页
         self.grammar_info_frame = ttk.Frame(self.result_notebook)
@@ -255,43 +394,12 @@ F → ( E ) | id"""
             self.parser = LL1Parser()
             
             grammar_text = self.grammar_text.get(1.0, tk.END).strip()
-            lines = grammar_text.split('\n')
-            
-            start_symbol_set = False
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 解析文法规则
-                if '→' in line or '->' in line:
-                    # 替换箭头符号
-                    line = line.replace('→', '->')
-                    parts = line.split('->')
-                    
-                    if len(parts) != 2:
-                        continue
-                    
-                    left = parts[0].strip()
-                    right = parts[1].strip()
-                    
-                    # 设置开始符号（第一个非终结符）
-                    if not start_symbol_set:
-                        self.parser.set_start_symbol(left)
-                        start_symbol_set = True
-                    
-                    # 处理多个产生式（用|分隔）
-                    if '|' in right:
-                        productions = right.split('|')
-                        for production in productions:
-                            production = production.strip()
-                            self.parser.add_grammar_rule(left, production)
-                    else:
-                        self.parser.add_grammar_rule(left, right)
             
-            if not start_symbol_set:
+            # 一遍读取全部规则（支持 ->、→、| 续行和注释），再批量载入，只推导一次符号集合
+            data = read_grammar(grammar_text, strict=False)
+            if not data.rules:
                 raise ValueError("未找到有效的文法规则")
+            self.parser.load_grammar(data.rules, data.start_symbol)
             
             messagebox.showinfo("成功", "文法解析成功！")
             
@@ -301,29 +409,76 @@ F → ( E ) | id"""
         except Exception as e:
             messagebox.showerror("错误", f"文法解析失败：{str(e)}")
     
-    def compute_analysis_table(self):
-        """计算分析表"""
+    def left_factor_grammar(self):
+        """对当前文法提取左公因子"""
+        if self._compute_thread is not None:
+            # 左公因子提取原地修改文法，不能与工作线程中的分析表计算同时进行
+            messagebox.showwarning("警告", "分析表正在计算中，请稍候")
+            return
+        
         try:
-            # 计算First和Follow集合
-            self.parser.compute_first_sets()
-            self.parser.compute_follow_sets()
-            
-            # 计算Select集合
-            self.parser.compute_select_sets()
-            
-            # 构造预测分析表
-            self.parser.build_predict_table()
-            
-            # 显示结果
-            self.display_first_sets()
-            self.display_follow_sets()
-            self.display_select_sets()
-            self.display_predict_table()
-            
-            messagebox.showinfo("成功", "分析表计算完成！")
-            
+            new_symbols = self.parser.left_factor()
+            self.clear_result_displays()
+            self.display_grammar_info()
+            if new_symbols:
+                messagebox.showinfo("成功", f"已提取左公因子，新增非终结符：{', '.join(new_symbols)}")
+            else:
+                messagebox.showinfo("提示", "文法中没有左公因子")
         except Exception as e:
-            messagebox.showerror("错误", f"分析表计算失败：{str(e)}")
+            messagebox.showerror("错误", f"提取左公因子失败：{str(e)}")
+    
+    def compute_analysis_table(self):
+        """计算分析表：各阶段在工作线程中执行，界面线程轮询结果队列"""
+        if self._compute_thread is not None:
+            return
+        
+        parser = self.parser
+        results = queue.Queue()
+        
+        def progress(phase, done, total):
+            results.put(('progress', phase, done, total))
+        
+        def worker():
+            try:
+                parser.compute_all(progress)
+                results.put(('done', None))
+            except Exception as e:
+                results.put(('error', str(e)))
+        
+        self.compute_button.state(['disabled'])
+        self.progress_bar['value'] = 0
+        self._compute_thread = threading.Thread(target=worker, daemon=True)
+        self._compute_thread.start()
+        self.root.after(50, self._poll_compute, parser, results)
+    
+    def _poll_compute(self, parser, results):
+        """在界面线程中处理工作线程发来的进度与结果"""
+        try:
+            while True:
+                message = results.get_nowait()
+                kind = message[0]
+                if kind == 'progress':
+                    _, phase, done, total = message
+                    self.progress_bar['value'] = 100 * done / total
+                    self.progress_var.set(phase)
+                    continue
+                
+                self._compute_thread = None
+                self.compute_button.state(['!disabled'])
+                if kind == 'error':
+                    self.progress_var.set("计算失败")
+                    messagebox.showerror("错误", f"分析表计算失败：{message[1]}")
+                elif parser is self.parser:
+                    # 计算期间文法可能已被重新解析，过期的结果直接丢弃
+                    self.display_first_sets()
+                    self.display_follow_sets()
+                    self.display_select_sets()
+                    self.display_predict_table()
+                    messagebox.showinfo("成功", "分析表计算完成！")
+                return
+        except queue.Empty:
+            pass
+        self.root.after(50, self._poll_compute, parser, results)
     
     def analyze_input(self):
         """分析输入串"""
@@ -333,9 +488,17 @@ F → ( E ) | id"""
             messagebox.showwarning("警告", "请输入要分析的字符串")
             return
         
+        if self._compute_thread is not None:
+            messagebox.showwarning("警告", "分析表正在计算中，请稍候")
+            return
+        
         try:
             # 执行分析
-            success, steps = self.parser.analyze(input_string)
+            errors = []
+            if self.recovery_var.get():
+                success, steps, errors = self.parser.analyze_with_recovery(input_string)
+            else:
+                success, steps = self.parser.analyze(input_string)
             
             # 清空之前的分析过程
             for item in self.analysis_tree.get_children():
@@ -352,7 +515,12 @@ F → ( E ) | id"""
             
             # 显示分析结果
             result = "接受" if success else "拒绝"
-            messagebox.showinfo("分析结果", f"输入串 '{input_string}' 的分析结果：{result}")
+            message = f"输入串 '{input_string}' 的分析结果：{result}"
+            if errors:
+                message += f"\n\n共发现 {len(errors)} 处错误：\n"
+                message += "\n".join(f"位置 {e['position']}（{e['token']}）：{e['message']}"
+                                      for e in errors)
+            messagebox.showinfo("分析结果", message)
             
         except Exception as e:
             messagebox.showerror("错误", f"分析失败：{str(e)}")
@@ -372,8 +540,11 @@ F → ( E ) | id"""
         self.first_text.delete(1.0, tk.END)
         self.follow_text.delete(1.0, tk.END)
         self.select_text.delete(1.0, tk.END)
+        self.table_view.clear()
         self.table_text.delete(1.0, tk.END)
         self.grammar_info_text.delete(1.0, tk.END)
+        self.progress_bar['value'] = 0
+        self.progress_var.set("")
         
         for item in self.analysis_tree.get_children():
             self.analysis_tree.delete(item)
@@ -417,33 +588,24 @@ F → ( E ) | id"""
         self.select_text.insert(1.0, content)
     
     def display_predict_table(self):
-        """显示预测分析表"""
-        self.table_text.delete(1.0, tk.END)
+        """显示预测分析表（虚拟表格按需生成可见单元格）与冲突报告"""
+        parser = self.parser
+        non_terminals = sorted(parser.non_terminals)
+        terminals = sorted(parser.terminals) + ['$']
         
-        content = "预测分析表：\n\n"
+        def cell_text(r, c):
+            A = non_terminals[r]
+            production = parser.predict_table[A].get(terminals[c])
+            return f"{A}→{' '.join(production)}" if production is not None else ""
         
-        # 获取所有终结符（包括$）
-        terminals = sorted(self.parser.terminals) + ['$']
+        def cell_highlight(r, c):
+            return terminals[c] in parser.conflict_index.get(non_terminals[r], ())
         
-        # 表头
-        header = "非终结符".ljust(12)
-        for terminal in terminals:
-            header += terminal.ljust(15)
-        content += header + "\n"
-        content += "-" * len(header) + "\n"
-        
-        # 表格内容
-        for non_terminal in sorted(self.parser.non_terminals):
-            row = non_terminal.ljust(12)
-            for terminal in terminals:
-                production = self.parser.predict_table[non_terminal][terminal]
-                if production is not None:
-                    production_str = f"{non_terminal}→{' '.join(production)}"
-                else:
-                    production_str = ""
-                row += production_str.ljust(15)
-            content += row + "\n"
+        self.table_view.set_data(non_terminals, terminals, cell_text, cell_highlight)
         
+        self.table_text.delete(1.0, tk.END)
+        content = f"预测分析表：{len(non_terminals)} 行 × {len(terminals)} 列（冲突格以红色标出）\n\n"
+        content += "冲突报告：\n\n" + parser.format_conflict_report() + "\n"
         self.table_text.insert(1.0, content)
     
     def display_grammar_info(self):
@@ -7,7 +7,7 @@ LL(1) 语法分析器
     自动构造预测分析表
 """
 
-from typing import Dict, List, Set, Tuple, Optional, Union
+from typing import Callable, Dict, List, Set, Tuple, Optional, Union
 
 
 class LL1ParserManual:
@@ -24,10 +24,12 @@ class LL1ParserManual:
         self.first_sets: Dict[str, Set[str]] = {}
         self.follow_sets: Dict[str, Set[str]] = {}
         self.select_sets: Dict[str, Dict[int, Set[str]]] = {}
-        # 预测分析表：M[A][a] = 产生式右部（List[str]）或 None
+        # 预测分析表：M[A][a] = 产生式右部（List[str]）；行稀疏存储，缺省为空
         self.predict_table: Dict[str, Dict[str, Optional[List[str]]]] = {}
         # 冲突记录（可选，可供调试）
         self.conflicts: List[Tuple[str, str, List[str], List[str]]] = []
+        # 冲突索引：A -> a -> 争用 M[A, a] 的产生式序号
+        self.conflict_index: Dict[str, Dict[str, List[int]]] = {}
         # 空串记号
         self.epsilon: str = 'ε'
 
@@ -57,6 +59,21 @@ class LL1ParserManual:
         # 每次增量更新一次符号集合，保证 GUI 解析后立即能看到集合
         self._derive_symbols()
 
+    def load_grammar(self, grammar: Dict[str, List[List[str]]], start_symbol: str = ''):
+        """
+        批量载入文法（A -> [alpha1, alpha2, ...]），只在最后推导一次符号集合。
+        大文法逐条调用 add_grammar_rule 会反复全量推导符号集合，批量载入避免这一开销。
+        """
+        for left, prods in grammar.items():
+            rules = self.grammar.setdefault(left, [])
+            for alpha in prods:
+                rules.append(list(alpha) if alpha else [self.epsilon])
+        if start_symbol:
+            self.set_start_symbol(start_symbol)
+        elif not self.start_symbol and self.grammar:
+            self.set_start_symbol(next(iter(self.grammar)))
+        self._derive_symbols()
+
     def set_start_symbol(self, symbol: str):
         self.start_symbol = symbol.strip()
 
@@ -73,6 +90,68 @@ class LL1ParserManual:
                 rhs_symbols.update(alpha)
         self.terminals = {s for s in rhs_symbols if s not in self.non_terminals and s != self.epsilon}
 
+    def left_factor(self) -> List[str]:
+        """
+        提取左公因子：A → δβ1 | δβ2 | γ  变为  A → δA' | γ，A' → β1 | β2
+        按首符号对候选式分组，对每组取最长公共前缀；新引入的非终结符放回工作队列，
+        直到所有非终结符的候选式首符号两两不同。返回新引入的非终结符列表。
+        文法改变后，已计算的 FIRST / FOLLOW / SELECT / 预测分析表全部作废。
+        """
+        new_symbols: List[str] = []
+        worklist = list(self.grammar.keys())
+        head = 0
+        while head < len(worklist):
+            A = worklist[head]
+            head += 1
+
+            # 按首符号分组，保持候选式的原有顺序
+            groups: Dict[str, List[List[str]]] = {}
+            for alpha in self.grammar[A]:
+                groups.setdefault(alpha[0], []).append(alpha)
+            if all(len(g) == 1 for g in groups.values()):
+                continue
+
+            new_prods: List[List[str]] = []
+            for first, group in groups.items():
+                if len(group) == 1 or first == self.epsilon:
+                    # 重复的 ε 候选式只保留一条
+                    new_prods.append(group[0])
+                    continue
+
+                # 最长公共前缀
+                prefix_len = 1
+                shortest = min(len(alpha) for alpha in group)
+                while prefix_len < shortest and \
+                        all(alpha[prefix_len] == group[0][prefix_len] for alpha in group):
+                    prefix_len += 1
+
+                new_symbol = A + "'"
+                while new_symbol in self.grammar:
+                    new_symbol += "'"
+
+                suffixes: List[List[str]] = []
+                for alpha in group:
+                    suffix = alpha[prefix_len:] or [self.epsilon]
+                    if suffix not in suffixes:
+                        suffixes.append(suffix)
+
+                self.grammar[new_symbol] = suffixes
+                new_symbols.append(new_symbol)
+                worklist.append(new_symbol)
+                new_prods.append(group[0][:prefix_len] + [new_symbol])
+
+            self.grammar[A] = new_prods
+
+        if new_symbols:
+            self._derive_symbols()
+            self.first_sets = {}
+            self.follow_sets = {}
+            self.select_sets = {}
+            self.predict_table = {}
+            self.conflicts = []
+            self.conflict_index = {}
+        return new_symbols
+
     # FIRST / FOLLOW / SELECT
 
     def compute_first_sets(self):
@@ -202,39 +281,124 @@ class LL1ParserManual:
     # 孙智博
     def build_predict_table(self):
         """
-        依据 SELECT 填 M[A, a]。若同一格出现多条产生式，记录冲突并打印警告。
-        GUI 会用 self.predict_table[非终结符][终结符或'$'] 读取。
+        依据 SELECT 填 M[A, a]。表按行稀疏存储：只保存非空格子，
+        GUI / 分析程序用 self.predict_table[A].get(a) 读取，缺省即为空（None）。
+        构造代价为 O(所有 SELECT 集合大小之和)，不再为新符号逐行补列。
+        同一格出现多条产生式时记入 self.conflicts 与 self.conflict_index，
+        详细说明见 get_conflict_report()。
         """
         if not self.select_sets:
             self.compute_select_sets()
 
         # 初始化
-        self.predict_table = {}
+        self.predict_table = {A: {} for A in self.non_terminals}
         self.conflicts = []
-        terminals_plus_end = sorted(self.terminals | {'$'})
-
-        for A in self.non_terminals:
-            self.predict_table[A] = {t: None for t in terminals_plus_end}
+        # 冲突索引：A -> a -> [争用该格的产生式序号]，只为发生冲突的格子建立
+        self.conflict_index = {}
+        # 每一格由哪条产生式（序号）最先填入
+        owners: Dict[str, Dict[str, int]] = {A: {} for A in self.non_terminals}
 
         # 填表
         for A, prods in self.grammar.items():
+            row = self.predict_table[A]
+            owner_row = owners[A]
             for idx, alpha in enumerate(prods):
-                select = self.select_sets[A][idx]
-                for a in select:
-                    # 只对“出现在表头的终结符或 $”填表
-                    if a not in self.predict_table[A]:
-                        # 若某些符号尚未登记为“终结符”，也补入（健壮性）
-                        for row in self.predict_table.values():
-                            row.setdefault(a, None)
-
-                    cell = self.predict_table[A][a]
-                    if cell is not None:
-                        # 冲突：已有规则
-                        self.conflicts.append((A, a, cell, alpha))
-                        print(f"警告：文法可能不是 LL(1)！冲突在 M[{A}, {a}]，"
-                              f"已存在 {A}→{' '.join(cell)}，又遇到 {A}→{' '.join(alpha)}")
+                for a in self.select_sets[A][idx]:
+                    # 若某些符号尚未登记为“终结符”，也补入表头（健壮性）
+                    if a != '$' and a not in self.terminals and a not in self.non_terminals:
+                        self.terminals.add(a)
+
+                    first_idx = owner_row.get(a)
+                    if first_idx is None:
+                        row[a] = alpha
+                        owner_row[a] = idx
+                        continue
+
+                    # 冲突：已有规则
+                    self.conflicts.append((A, a, row[a], alpha))
+                    cell = self.conflict_index.setdefault(A, {}).setdefault(a, [first_idx])
+                    cell.append(idx)
+
+        if self.conflicts:
+            print(f"警告：文法不是 LL(1)！共 {len(self.conflicts)} 处冲突，"
+                  f"涉及非终结符 {', '.join(sorted(self.conflict_index))}")
+
+    def get_conflict_report(self) -> Dict[str, List[Dict]]:
+        """
+        按非终结符分组的结构化冲突报告：
+        {A: [{'terminal': a, 'kind': 'FIRST/FIRST' 或 'FIRST/FOLLOW',
+              'productions': [{'index', 'production', 'source'}, ...]}, ...]}
+        source 说明 a 是由 FIRST(α) 还是由 FOLLOW(A)（α ⇒* ε 时）带入 SELECT 的。
+        只为参与冲突的产生式重新计算 FIRST(α)，代价与冲突规模成正比。
+        """
+        if not self.predict_table:
+            self.build_predict_table()
+
+        report: Dict[str, List[Dict]] = {}
+        first_cache: Dict[Tuple[str, int], Set[str]] = {}
+        for A in sorted(self.conflict_index):
+            entries = []
+            prods = self.grammar[A]
+            for a in sorted(self.conflict_index[A]):
+                contributions = []
+                via_follow = False
+                for idx in self.conflict_index[A][a]:
+                    key = (A, idx)
+                    if key not in first_cache:
+                        first_cache[key] = self._first_of_sequence(prods[idx])
+                    first_alpha = first_cache[key]
+                    alpha_str = ' '.join(prods[idx])
+                    if a in first_alpha:
+                        source = f"FIRST({alpha_str})"
                     else:
-                        self.predict_table[A][a] = alpha
+                        source = f"FOLLOW({A})（{alpha_str} ⇒* ε）"
+                        via_follow = True
+                    contributions.append({
+                        'index': idx,
+                        'production': f"{A} → {alpha_str}",
+                        'source': source
+                    })
+                entries.append({
+                    'terminal': a,
+                    'kind': 'FIRST/FOLLOW' if via_follow else 'FIRST/FIRST',
+                    'productions': contributions
+                })
+            report[A] = entries
+        return report
+
+    def format_conflict_report(self) -> str:
+        """将 get_conflict_report() 的结果格式化为便于阅读的文本"""
+        report = self.get_conflict_report()
+        if not report:
+            return "无冲突，文法是 LL(1) 文法。"
+
+        lines = [f"共 {len(self.conflicts)} 处冲突，涉及 {len(report)} 个非终结符："]
+        for A, entries in report.items():
+            lines.append(f"{A}:")
+            for entry in entries:
+                lines.append(f"  M[{A}, {entry['terminal']}]（{entry['kind']} 冲突）")
+                for c in entry['productions']:
+                    lines.append(f"    {c['production']}    来自 {c['source']}")
+        return '\n'.join(lines)
+
+    def compute_all(self, progress: Optional[Callable[[str, int, int], None]] = None):
+        """
+        依次计算 FIRST / FOLLOW / SELECT 并构造预测分析表。
+        progress(阶段名, 已完成阶段数, 总阶段数) 在每个阶段开始前和全部完成后各调用一次，
+        GUI 在工作线程中调用本方法，通过回调汇报进度。
+        """
+        phases = [
+            ('计算 FIRST 集合', self.compute_first_sets),
+            ('计算 FOLLOW 集合', self.compute_follow_sets),
+            ('计算 SELECT 集合', self.compute_select_sets),
+            ('构造预测分析表', self.build_predict_table),
+        ]
+        for i, (name, phase) in enumerate(phases):
+            if progress is not None:
+                progress(name, i, len(phases))
+            phase()
+        if progress is not None:
+            progress('完成', len(phases), len(phases))
 
     # 分析
     # 王宝飞
@@ -321,6 +485,136 @@ class LL1ParserManual:
             })
             return False, steps
 
+    def analyze_with_recovery(self, input_string: str, max_errors: int = 50,
+                              record_steps: bool = True
+                              ) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        带紧急（panic-mode）错误恢复的 LL(1) 分析：返回 (是否接受, 步骤记录, 错误列表)
+        以 FOLLOW(X) 作为同步集合：
+        - 栈顶终结符与输入不匹配：报告“缺少 X”并弹出 X（视为已插入）
+        - M[X, a] 为空且 a ∈ FOLLOW(X) 或 a 为 $：弹出 X（视为 X ⇒ ε）
+        - M[X, a] 为空且 a 不在同步集合中：跳过输入符号 a
+        每一步要么弹栈要么前移输入，因此整体仍是线性的。
+        上一个错误之后尚未成功匹配任何符号时产生的错误视为级联错误，不再重复报告；
+        报告的错误数达到 max_errors 时停止分析。
+        record_steps=False 时不记录逐步的栈/输入快照（大文件校验时避免 O(n²) 的拼接开销）。
+        """
+        if not self.predict_table:
+            self.compute_first_sets()
+            self.compute_follow_sets()
+            self.compute_select_sets()
+            self.build_predict_table()
+
+        tokens = input_string.split() if input_string.strip() else []
+        tokens.append('$')
+
+        stack: List[str] = ['$', self.start_symbol]
+        input_index = 0
+        steps: List[Dict[str, str]] = []
+        errors: List[Dict[str, str]] = []
+        # 上一个错误之后是否已成功匹配过终结符（用于抑制级联错误）
+        matched_since_error = True
+
+        def report(message: str) -> bool:
+            """记录一个错误；返回 False 表示已达到错误上限"""
+            nonlocal matched_since_error
+            if matched_since_error:
+                errors.append({
+                    'position': str(input_index),
+                    'token': tokens[input_index],
+                    'message': message
+                })
+                matched_since_error = False
+            return len(errors) < max_errors
+
+        while True:
+            if len(stack) == 1:
+                if tokens[input_index] == '$':
+                    break
+                # 栈已空但输入未消费完：跳过多余符号，再以开始符号重新同步
+                go_on = report('输入未完全匹配')
+                if record_steps:
+                    steps.append({
+                        'step': str(len(steps) + 1),
+                        'stack': '$',
+                        'input': ' '.join(tokens[input_index:]),
+                        'action': f'错误：输入未完全匹配；跳过 {tokens[input_index]}'
+                    })
+                input_index += 1
+                if not go_on:
+                    return False, steps, errors
+                if tokens[input_index] != '$':
+                    stack.append(self.start_symbol)
+                continue
+
+            X = stack[-1]
+            a = tokens[input_index]
+            step = None
+            if record_steps:
+                step = {
+                    'step': str(len(steps) + 1),
+                    'stack': ' '.join(stack),
+                    'input': ' '.join(tokens[input_index:]),
+                    'action': ''
+                }
+            go_on = True
+
+            if X == '$' or X in self.terminals:
+                if X == a:
+                    stack.pop()
+                    input_index += 1
+                    matched_since_error = True
+                    action = f'匹配 {a}'
+                else:
+                    go_on = report(f'缺少 {X}')
+                    stack.pop()
+                    action = f'错误：期望 {X}，得到 {a}；弹出 {X}'
+
+            elif X in self.non_terminals:
+                production = self.predict_table.get(X, {}).get(a)
+                if production is not None:
+                    stack.pop()
+                    for sym in reversed(production):
+                        if sym != self.epsilon:
+                            stack.append(sym)
+                    action = f'使用规则 {X} → {" ".join(production)}'
+                elif a == '$' or a in self.follow_sets.get(X, ()):
+                    stack.pop()
+                    action = f'错误：M[{X}, {a}]为空；{a} ∈ FOLLOW({X})，弹出 {X}'
+                    go_on = report(f'M[{X}, {a}]为空')
+                else:
+                    go_on = report(f'M[{X}, {a}]为空')
+                    input_index += 1
+                    action = f'错误：M[{X}, {a}]为空；跳过 {a}'
+
+            else:
+                go_on = report(f'未知符号 {X}')
+                stack.pop()
+                action = f'错误：未知符号 {X}；弹出 {X}'
+
+            if step is not None:
+                step['action'] = action
+                steps.append(step)
+
+            if not go_on:
+                if record_steps:
+                    steps.append({
+                        'step': str(len(steps) + 1),
+                        'stack': ' '.join(stack),
+                        'input': ' '.join(tokens[input_index:]),
+                        'action': f'错误过多（{max_errors}），停止分析'
+                    })
+                return False, steps, errors
+
+        if record_steps:
+            steps.append({
+                'step': str(len(steps) + 1),
+                'stack': '$',
+                'input': '$',
+                'action': '接受' if not errors else '结束（存在错误）'
+            })
+        return not errors, steps, errors
+
     # 信息导出
     def get_grammar_info(self) -> Dict:
         return {
@@ -335,8 +629,7 @@ class LL1ParserManual:
             'follow_sets': {k: sorted(list(v)) for k, v in self.follow_sets.items()},
             'select_sets': {A: {str(i): sorted(list(s)) for i, s in d.items()}
                             for A, d in self.select_sets.items()},
-            'predict_table': {A: {a: (None if rhs is None else rhs)
-                                  for a, rhs in row.items()}
+            'predict_table': {A: {a: row.get(a) for a in sorted(self.terminals | {'$'})}
                               for A, row in self.predict_table.items()},
             'conflicts': [{'A': A, 'a': a,
                            'exist': ' '.join(exist),
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LL(k) 语法分析器（k = 2, 3 ...，强 LL(k)）
+    以 LL1ParserManual 的文法为输入
+    计算 FIRST_k / FOLLOW_k（长度不超过 k 的终结符串集合）
+    构造以 k 个向前看符号为列的预测分析表
+
+表示方式：
+    终结符（含 $）编号为 1..T，长度不超过 k 的终结符串左对齐编码为一个整数
+        code(a1 a2 ... am) = Σ id(ai) · B^(k-i)，B = T + 1
+    空串编码为 0。于是 k-截断连接 u ⊕k v 只需一次整除和加法：
+        u ⊕k v = u + v // B^|u|
+    集合就是 Python 的 int 集合；连接时按 |u| 分组，对每个长度只截断一次 v 集合
+    （相当于在 v 的前缀树上取第 k-|u| 层），k > 1 时在中等规模文法上仍然可用。
+"""
+
+from typing import Dict, List, Set, Tuple, Optional
+
+from ll1_parser import LL1ParserManual
+
+
+class LLkParser:
+
+    def __init__(self, base: LL1ParserManual, k: int = 2):
+        if k < 1:
+            raise ValueError("k 必须为正整数")
+        if not base.start_symbol:
+            raise ValueError("请先设置开始符号 start_symbol")
+
+        base._derive_symbols()
+        self.k = k
+        self.grammar: Dict[str, List[List[str]]] = base.grammar
+        self.start_symbol: str = base.start_symbol
+        self.non_terminals: Set[str] = set(base.non_terminals)
+        self.terminals: Set[str] = set(base.terminals)
+        self.epsilon: str = base.epsilon
+
+        # 终结符编号：1..T，$ 也作为终结符参与编码
+        self.symbols: List[str] = [''] + sorted(self.terminals) + ['$']
+        self.ids: Dict[str, int] = {a: i for i, a in enumerate(self.symbols) if a}
+        self.base = len(self.symbols)
+        self._pow = [self.base ** i for i in range(k + 1)]
+        self._len_cache: Dict[int, int] = {0: 0}
+
+        self.first_sets: Dict[str, Set[int]] = {}
+        self.follow_sets: Dict[str, Set[int]] = {}
+        # M[A][w] = 产生式右部，w 为编码后的向前看串
+        self.predict_table: Dict[str, Dict[int, List[str]]] = {}
+        self.conflicts: List[Tuple[str, str, List[str], List[str]]] = []
+
+    # 编码工具
+
+    def encode(self, seq: List[str]) -> int:
+        """终结符串（最多 k 个）编码为整数"""
+        code = 0
+        for i, a in enumerate(seq[:self.k]):
+            code += self.ids[a] * self._pow[self.k - 1 - i]
+        return code
+
+    def decode(self, code: int) -> str:
+        """整数编码还原为空格分隔的终结符串，空串返回 ε"""
+        out = []
+        for i in range(self.k):
+            digit = code // self._pow[self.k - 1 - i] % self.base
+            if digit == 0:
+                break
+            out.append(self.symbols[digit])
+        return ' '.join(out) if out else self.epsilon
+
+    def _length(self, code: int) -> int:
+        """编码串的长度（带缓存）"""
+        n = self._len_cache.get(code)
+        if n is None:
+            n = self.k
+            c = code
+            while c % self.base == 0:
+                c //= self.base
+                n -= 1
+            self._len_cache[code] = n
+        return n
+
+    def _concat(self, left: Set[int], right: Set[int]) -> Set[int]:
+        """k-截断连接：{ (u v)[:k] | u ∈ left, v ∈ right }"""
+        result: Set[int] = set()
+        tails_by_len: Dict[int, Set[int]] = {}
+        for u in left:
+            n = self._length(u)
+            if n >= self.k:
+                result.add(u)
+                continue
+            tails = tails_by_len.get(n)
+            if tails is None:
+                shift = self._pow[n]
+                tails = tails_by_len[n] = {v // shift for v in right}
+            result.update(u + t for t in tails)
+        return result
+
+    def _first_of_sequence(self, seq: List[str]) -> Set[int]:
+        """FIRST_k(符号串)，空串为 {0}"""
+        result: Set[int] = {0}
+        for X in seq:
+            if X == self.epsilon:
+                continue
+            if X in self.non_terminals:
+                FX = self.first_sets[X]
+            else:
+                FX = {self.ids[X] * self._pow[self.k - 1]}
+            result = self._concat(result, FX)
+            if not result or all(self._length(w) >= self.k for w in result):
+                break
+        return result
+
+    # FIRST_k / FOLLOW_k
+
+    def compute_first_sets(self):
+        self.first_sets = {A: set() for A in self.non_terminals}
+        changed = True
+        while changed:
+            changed = False
+            for A, prods in self.grammar.items():
+                target = self.first_sets[A]
+                before = len(target)
+                for alpha in prods:
+                    target |= self._first_of_sequence(alpha)
+                if len(target) != before:
+                    changed = True
+
+    def compute_follow_sets(self):
+        """
+        FOLLOW_k(S) ∋ $；A → α B β ：FIRST_k(β) ⊕k FOLLOW_k(A) ⊆ FOLLOW_k(B)
+        FIRST_k(β) 与 FOLLOW 无关，迭代前先对所有位置算好
+        """
+        if not self.first_sets:
+            self.compute_first_sets()
+
+        occurrences: List[Tuple[str, str, Set[int]]] = []
+        for A, prods in self.grammar.items():
+            for alpha in prods:
+                for i, B in enumerate(alpha):
+                    if B in self.non_terminals:
+                        occurrences.append((A, B, self._first_of_sequence(alpha[i + 1:])))
+
+        self.follow_sets = {A: set() for A in self.non_terminals}
+        self.follow_sets[self.start_symbol].add(self.encode(['$']))
+
+        changed = True
+        while changed:
+            changed = False
+            for A, B, first_beta in occurrences:
+                target = self.follow_sets[B]
+                before = len(target)
+                target |= self._concat(first_beta, self.follow_sets[A])
+                if len(target) != before:
+                    changed = True
+
+    # 预测分析表
+
+    def build_predict_table(self):
+        """M[A, w]，w ∈ FIRST_k(α) ⊕k FOLLOW_k(A)；同一格多条产生式记为冲突"""
+        if not self.follow_sets:
+            self.compute_follow_sets()
+
+        self.predict_table = {A: {} for A in self.non_terminals}
+        self.conflicts = []
+        for A, prods in self.grammar.items():
+            row = self.predict_table[A]
+            for alpha in prods:
+                lookaheads = self._concat(self._first_of_sequence(alpha), self.follow_sets[A])
+                for w in lookaheads:
+                    cell = row.get(w)
+                    if cell is None:
+                        row[w] = alpha
+                    else:
+                        self.conflicts.append((A, self.decode(w), cell, alpha))
+
+    def is_llk(self) -> bool:
+        if not self.predict_table:
+            self.build_predict_table()
+        return not self.conflicts
+
+    # 分析
+
+    def analyze(self, input_string: str) -> Tuple[bool, List[Dict[str, str]]]:
+        """LL(k) 分析：返回 (是否接受, 步骤记录)，步骤格式与 LL1ParserManual.analyze 相同"""
+        if not self.predict_table:
+            self.build_predict_table()
+
+        tokens = input_string.split() if input_string.strip() else []
+        tokens.append('$')
+
+        stack: List[str] = ['$', self.start_symbol]
+        input_index = 0
+        steps: List[Dict[str, str]] = []
+
+        def fail(step: Dict[str, str], message: str) -> Tuple[bool, List[Dict[str, str]]]:
+            step['action'] = message
+            steps.append(step)
+            return False, steps
+
+        while len(stack) > 1:
+            step = {
+                'step': str(len(steps) + 1),
+                'stack': ' '.join(stack),
+                'input': ' '.join(tokens[input_index:]),
+                'action': ''
+            }
+            X = stack[-1]
+            a = tokens[input_index]
+
+            if X in self.terminals:
+                if X != a:
+                    return fail(step, f'错误：期望 {X}，得到 {a}')
+                stack.pop()
+                input_index += 1
+                step['action'] = f'匹配 {a}'
+
+            elif X in self.non_terminals:
+                # 向前看 k 个符号（遇到 $ 截止）
+                window = tokens[input_index:input_index + self.k]
+                if '$' in window:
+                    window = window[:window.index('$') + 1]
+                unknown = [t for t in window if t not in self.ids]
+                if unknown:
+                    return fail(step, f'错误：未知符号 {unknown[0]}')
+                lookahead = self.encode(window)
+                production = self.predict_table[X].get(lookahead)
+                if production is None:
+                    return fail(step, f'错误：M[{X}, {self.decode(lookahead)}]为空')
+
+                stack.pop()
+                for sym in reversed(production):
+                    if sym != self.epsilon:
+                        stack.append(sym)
+                step['action'] = f'使用规则 {X} → {" ".join(production)}'
+
+            else:
+                return fail(step, f'错误：未知符号 {X}')
+
+            steps.append(step)
+
+        if tokens[input_index] == '$':
+            steps.append({'step': str(len(steps) + 1), 'stack': '$', 'input': '$', 'action': '接受'})
+            return True, steps
+        steps.append({
+            'step': str(len(steps) + 1),
+            'stack': '$',
+            'input': ' '.join(tokens[input_index:]),
+            'action': '错误：输入未完全匹配'
+        })
+        return False, steps
+
+    # 信息导出
+    def get_sets_text(self) -> Dict[str, Dict[str, List[str]]]:
+        """FIRST_k / FOLLOW_k 的可读形式"""
+        return {
+            'first_sets': {A: sorted(self.decode(w) for w in s) for A, s in self.first_sets.items()},
+            'follow_sets': {A: sorted(self.decode(w) for w in s) for A, s in self.follow_sets.items()},
+        }
+
+
+def create_llk_parser(base: LL1ParserManual, max_k: int = 3) -> Tuple[Optional[LLkParser], int]:
+    """
+    依次尝试 k = 1..max_k，返回第一个无冲突的 LLkParser 及其 k；都失败时返回 (None, 0)
+    """
+    for k in range(1, max_k + 1):
+        parser = LLkParser(base, k)
+        if parser.is_llk():
+            return parser, k
+    return None, 0
+
+
+#自测
+if __name__ == "__main__":
+    # S → a b | a c 不是 LL(1)，但是 LL(2)
+    base = LL1ParserManual()
+    base.add_grammar_rule('S', "A b")
+    base.add_grammar_rule('S', "A c")
+    base.add_grammar_rule('A', "a")
+    base.add_grammar_rule('A', "ε")
+    base.set_start_symbol('S')
+
+    parser, k = create_llk_parser(base, 3)
+    print("k =", k)
+    for name, sets in parser.get_sets_text().items():
+        for A in sorted(sets):
+            print(f"{name}[{A}] = {sets[A]}")
+    for sentence in ["a b", "c", "a a"]:
+        ok, steps = parser.analyze(sentence)
+        print(sentence, "=>", "接受" if ok else "拒绝")
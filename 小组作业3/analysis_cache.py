@@ -0,0 +1,137 @@
+"""
+分析结果缓存
+同一个表达式反复提交时，直接返回上次的词法、语法分析结果和编译结果，
+不再重新创建 Lexer / Parser。
+
+    result = cached_analyze("x=3+5*2#")
+    result['program'].evaluate({})       # 编译后的表达式（分析失败时为 None）
+    default_cache.stats()                # {'hits': ..., 'misses': ..., 'evictions': ...}
+
+缓存键是输入串截至结束符 '#' 的部分（见 normalize_source），
+按最近最少使用（LRU）淘汰，容量可配置，可在多个线程中共享。
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+from parser import analyze
+from compiler import ASTBuilder, compile_ast, fold_constants
+
+
+_TERMINATOR_OR_COMMENT = re.compile(r'#|//|/\*')
+
+
+def normalize_source(input_string):
+    """
+    缓存键：词法分析产生结束符 '#'（注释之外的第一个 '#'）后停止，之后的内容不影响结果，去掉；
+    没有结束符时保留整个输入串（EOF 的位置与输入长度有关，结尾空白也不能去掉）
+    注释的识别与 lexer 相同：// 到行尾，/* 到 */
+    """
+    pos = 0
+    while True:
+        hit = _TERMINATOR_OR_COMMENT.search(input_string, pos)
+        if hit is None:
+            return input_string
+        if hit.group() == '#':
+            return input_string[:hit.end()]
+        end = input_string.find('\n' if hit.group() == '//' else '*/', hit.end())
+        if end < 0:
+            return input_string
+        pos = end + (1 if hit.group() == '//' else 2)
+
+
+class AnalysisCache:
+    """线程安全的 LRU 分析结果缓存"""
+
+    def __init__(self, capacity=256, trace=False):
+        if capacity < 1:
+            raise ValueError("缓存容量必须为正整数")
+        self.capacity = capacity
+        self.trace = trace  # 是否保存分析过程（ParseTrace）
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def analyze(self, input_string):
+        """
+        返回 parser.analyze 的结果，另加两项：
+            'ast'     : 语法树（分析失败时为 None）
+            'program' : compiler.CompiledExpression（分析失败时为 None）
+        返回的字典是缓存条目的浅拷贝，其中的 Token 列表、语法树等对象被所有调用者共享，应只读使用
+        """
+        key = normalize_source(input_string)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry)
+            self.misses += 1
+
+        # 分析在锁外进行；两个线程同时分析同一个键时，后写入的结果覆盖前一个（内容相同）
+        entry = self._compute(input_string)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return dict(entry)
+
+    def _compute(self, input_string):
+        result = analyze(input_string, trace=self.trace)
+        result['ast'] = None
+        result['program'] = None
+        if result['success']:
+            # 复用已经得到的 Token 序列构造语法树
+            success, tree = ASTBuilder(result['tokens']).parse()
+            if success:
+                result['ast'] = tree
+                result['program'] = compile_ast(fold_constants(tree))
+        return result
+
+    def stats(self):
+        """命中、未命中、淘汰次数和当前条目数"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'capacity': self.capacity,
+            }
+
+    def resize(self, capacity):
+        """修改容量，多出的条目按 LRU 顺序淘汰"""
+        if capacity < 1:
+            raise ValueError("缓存容量必须为正整数")
+        with self._lock:
+            self.capacity = capacity
+            while len(self._entries) > capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存和计数器"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, input_string):
+        return normalize_source(input_string) in self._entries
+
+
+# 模块级默认缓存
+default_cache = AnalysisCache()
+
+
+def cached_analyze(input_string):
+    """使用默认缓存的 analyze"""
+    return default_cache.analyze(input_string)
@@ -0,0 +1,187 @@
+"""
+批量语句检查（命令行）
+从文件或标准输入逐行读取语句（每行一条，以 # 结束），用多个进程并行做词法、语法分析，
+可选地求值，结果按输入顺序以 JSON Lines 格式输出，最后在标准错误输出统计信息。
+
+用法：
+    python3 batch.py statements.txt -o results.jsonl
+    cat statements.txt | python3 batch.py --evaluate --var a=1 --var b=2.5
+    python3 batch.py big.txt --workers 8 --chunk-size 5000 -o /dev/null
+
+输入按块读取，同时在途的块数有上限，内存占用与输入文件大小无关。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from analysis_cache import AnalysisCache
+from compiler import EvaluationError
+
+
+# 每个工作进程各自的缓存，重复出现的语句只分析一次
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = AnalysisCache(capacity=4096)
+    return _cache
+
+
+def process_chunk(first_line, lines, evaluate, env):
+    """
+    处理一块输入，返回 (已编码的 JSON 行列表, 语法错误数, 求值错误数)
+    first_line 为块中第一行的行号（从 1 开始）
+    """
+    cache = _get_cache()
+    out = []
+    syntax_errors = eval_errors = 0
+    for number, text in enumerate(lines, first_line):
+        text = text.rstrip('\r\n')
+        record = {'line': number, 'input': text}
+        result = cache.analyze(text)
+        record['success'] = result['success']
+        record['error'] = result['error']
+        if not result['success']:
+            syntax_errors += 1
+        if evaluate and result['program'] is not None:
+            try:
+                record['value'] = result['program'].evaluate(dict(env))
+            except EvaluationError as e:
+                record['value'] = None
+                record['eval_error'] = str(e)
+                eval_errors += 1
+        out.append(json.dumps(record, ensure_ascii=False))
+    return out, syntax_errors, eval_errors
+
+
+def _read_chunks(stream, chunk_size, skip_blank):
+    """按块读取输入行，返回 (块首行号, 行列表)"""
+    number = 1
+    while True:
+        lines = list(islice(stream, chunk_size))
+        if not lines:
+            return
+        if skip_blank:
+            # 保留行号：空行不输出结果，但计入行号
+            chunk = [(i, line) for i, line in enumerate(lines, number) if line.strip()]
+            for start, group in _runs(chunk):
+                yield start, group
+        else:
+            yield number, lines
+        number += len(lines)
+
+
+def _runs(numbered_lines):
+    """把 (行号, 行) 序列按连续行号切分，返回 (起始行号, 行列表)"""
+    start = None
+    group = []
+    for number, line in numbered_lines:
+        if group and number != start + len(group):
+            yield start, group
+            group = []
+        if not group:
+            start = number
+        group.append(line)
+    if group:
+        yield start, group
+
+
+def _write(output, chunk_result, stats):
+    """写出一块结果并累计统计"""
+    encoded, syntax_errors, eval_errors = chunk_result
+    stats['statements'] += len(encoded)
+    stats['syntax_errors'] += syntax_errors
+    stats['eval_errors'] += eval_errors
+    output.write('\n'.join(encoded) + '\n')
+
+
+def run_batch(stream, output, workers=None, chunk_size=2000, evaluate=False, env=None,
+              skip_blank=True, max_in_flight=None):
+    """
+    批量处理输入流，返回统计信息
+    workers=1 时在当前进程内处理，不创建进程池
+    """
+    env = env or {}
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    stats = {'statements': 0, 'syntax_errors': 0, 'eval_errors': 0}
+    start = time.perf_counter()
+
+    chunks = _read_chunks(stream, chunk_size, skip_blank)
+    if workers == 1:
+        for first_line, lines in chunks:
+            _write(output, process_chunk(first_line, lines, evaluate, env), stats)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for first_line, lines in chunks:
+                # 在途块数达到上限时，先按顺序写出最早提交的块
+                if len(pending) >= max_in_flight:
+                    _write(output, pending.popleft().result(), stats)
+                pending.append(executor.submit(process_chunk, first_line, lines, evaluate, env))
+            while pending:
+                _write(output, pending.popleft().result(), stats)
+
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def _parse_binding(text):
+    """--var name=value"""
+    name, sep, value = text.partition('=')
+    if not sep or not name.strip():
+        raise argparse.ArgumentTypeError(f"变量绑定格式应为 name=value：{text}")
+    try:
+        number = float(value) if '.' in value or 'e' in value.lower() else int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"变量值必须是数字：{text}")
+    return name.strip(), number
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="批量检查（并求值）以 # 结束的语句，结果输出为 JSON Lines")
+    ap.add_argument('input', nargs='?', default='-', help="输入文件，省略或 - 表示标准输入")
+    ap.add_argument('-o', '--output', default='-', help="输出文件，省略或 - 表示标准输出")
+    ap.add_argument('-j', '--workers', type=int, default=None, help="工作进程数（默认 CPU 核数）")
+    ap.add_argument('--chunk-size', type=int, default=2000, help="每块的行数")
+    ap.add_argument('--evaluate', action='store_true', help="对分析成功的语句求值")
+    ap.add_argument('--var', type=_parse_binding, action='append', default=[],
+                    metavar='NAME=VALUE', help="求值时的变量绑定（可重复）")
+    ap.add_argument('--keep-blank', action='store_true', help="空行也作为语句输出（默认跳过）")
+    args = ap.parse_args(argv)
+
+    if args.chunk_size < 1:
+        ap.error("--chunk-size 必须为正整数")
+    if args.workers is not None and args.workers < 1:
+        ap.error("--workers 必须为正整数")
+
+    stream = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        stats = run_batch(stream, output, workers=args.workers, chunk_size=args.chunk_size,
+                          evaluate=args.evaluate, env=dict(args.var),
+                          skip_blank=not args.keep_blank)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if output is not sys.stdout:
+            output.close()
+
+    seconds = stats['seconds']
+    rate = stats['statements'] / seconds if seconds > 0 else 0.0
+    print(f"语句数: {stats['statements']}  语法错误: {stats['syntax_errors']}  "
+          f"求值错误: {stats['eval_errors']}  耗时: {seconds:.2f} s  速度: {rate:.0f} 条/s",
+          file=sys.stderr)
+    return 1 if stats['syntax_errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""
+表达式的语法树构造、编译与求值
+    1. 用算符优先分析器（precedence_parser）构造语法树（AST）
+    2. 把语法树后序遍历编译为扁平的栈式指令序列
+    3. 指令解释器在变量环境中执行指令
+
+一次分析、编译之后可以在不同的变量取值下反复求值，不必重新做词法和语法分析：
+    program = compile_expression("x=3+5*a#")
+    program.evaluate({'a': 2})      # 13，并把 x 写回环境
+    program.run([2])                # 按 program.variables 的顺序传值，最快
+"""
+
+from lexer import TokenType, Lexer
+from parser import ParseError
+from precedence_parser import PrecedenceParser
+
+
+class EvaluationError(Exception):
+    """求值错误异常（未定义的变量、除以零）"""
+    pass
+
+
+# ==================== 语法树 ====================
+
+class Num:
+    """数字常量"""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f"Num({self.value!r})"
+
+
+class Var:
+    """变量引用"""
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"Var({self.name!r})"
+
+
+class BinOp:
+    """二元运算，op 为 '+'、'-'、'*'、'/'"""
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def __repr__(self):
+        return f"BinOp({self.op!r}, {self.left!r}, {self.right!r})"
+
+
+class Assign:
+    """赋值语句 name = value"""
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def __repr__(self):
+        return f"Assign({self.name!r}, {self.value!r})"
+
+
+def parse_number(text):
+    """NUM 的词素转换为 int（整数）或 float（小数）"""
+    return float(text) if '.' in text else int(text)
+
+
+class ASTBuilder(PrecedenceParser):
+    """在算符优先分析器的归约动作中构造语法树"""
+
+    def make_leaf(self, token):
+        if token.type == TokenType.NUM:
+            return Num(parse_number(token.value))
+        return Var(token.value)
+
+    def make_binary(self, op_token, left, right):
+        return BinOp(op_token.value, left, right)
+
+    def make_assign(self, id_token, value):
+        return Assign(id_token.value, value)
+
+
+def parse_ast(input_string):
+    """词法、语法分析并返回语法树；语法错误抛出 ParseError"""
+    tokens = Lexer(input_string).tokenize()
+    builder = ASTBuilder(tokens)
+    success, tree = builder.parse()
+    if not success:
+        raise ParseError(builder.error_messages[0])
+    return tree
+
+
+def format_ast(tree):
+    """语法树的缩进文本形式（显式栈先序遍历）"""
+    lines = []
+    work = [(tree, 0)]
+    while work:
+        node, indent = work.pop()
+        pad = "  " * indent
+        if isinstance(node, Num):
+            lines.append(f"{pad}NUM {node.value}")
+        elif isinstance(node, Var):
+            lines.append(f"{pad}ID {node.name}")
+        elif isinstance(node, Assign):
+            lines.append(f"{pad}ASSIGN {node.name}")
+            work.append((node.value, indent + 1))
+        else:
+            lines.append(f"{pad}{node.op}")
+            work.append((node.right, indent + 1))
+            work.append((node.left, indent + 1))
+    return "\n".join(lines)
+
+
+_FOLD_OPERATIONS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a / b,
+}
+
+
+def fold_constants(tree):
+    """
+    常量折叠：两个操作数都是常量的二元运算直接算出结果（显式栈后序遍历）
+    除数为常量 0 的运算保留，留到求值时报错
+    """
+    root = tree.value if isinstance(tree, Assign) else tree
+    results = []
+    work = [(root, False)]
+    while work:
+        node, expanded = work.pop()
+        if not isinstance(node, BinOp):
+            results.append(node)
+        elif not expanded:
+            work.append((node, True))
+            work.append((node.right, False))
+            work.append((node.left, False))
+        else:
+            right = results.pop()
+            left = results.pop()
+            if (isinstance(left, Num) and isinstance(right, Num)
+                    and not (node.op == '/' and right.value == 0)):
+                results.append(Num(_FOLD_OPERATIONS[node.op](left.value, right.value)))
+            elif left is node.left and right is node.right:
+                results.append(node)
+            else:
+                results.append(BinOp(node.op, left, right))
+    if isinstance(tree, Assign):
+        return Assign(tree.name, results[0])
+    return results[0]
+
+
+# ==================== 指令 ====================
+
+# 操作码；LOAD_CONST 的参数为常量，LOAD_VAR / STORE_VAR 的参数为变量槽位
+LOAD_CONST = 0
+LOAD_VAR = 1
+ADD = 2
+SUB = 3
+MUL = 4
+DIV = 5
+STORE_VAR = 6
+
+OPCODE_NAMES = ['LOAD_CONST', 'LOAD_VAR', 'ADD', 'SUB', 'MUL', 'DIV', 'STORE_VAR']
+
+_BINARY_OPCODES = {'+': ADD, '-': SUB, '*': MUL, '/': DIV}
+
+
+class CompiledExpression:
+    """
+    编译后的表达式
+        code      : [(操作码, 参数), ...]，按执行顺序排列
+        variables : 变量槽位对应的变量名（含赋值目标）
+        inputs    : 表达式读取的变量个数，即 variables 的前 inputs 个
+        target    : 赋值语句的目标变量名，普通表达式为 None
+    """
+
+    __slots__ = ('code', 'variables', 'inputs', 'target', 'max_stack')
+
+    def __init__(self, code, variables, inputs, target, max_stack):
+        self.code = code
+        self.variables = variables
+        self.inputs = inputs
+        self.target = target
+        self.max_stack = max_stack
+
+    def run(self, values):
+        """
+        按 variables 的顺序传入变量值并执行，返回表达式的值
+        values 为可变序列时，赋值结果写回目标变量的槽位
+        运算总是产生新对象，不原地修改传入的值（如 NumPy 数组）；
+        除以零只对标量抛出 EvaluationError，整列数据的求值用 vectorized.py
+        """
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for op, arg in self.code:
+            if op == LOAD_VAR:
+                push(values[arg])
+            elif op == LOAD_CONST:
+                push(arg)
+            elif op == ADD:
+                b = pop()
+                stack[-1] = stack[-1] + b
+            elif op == SUB:
+                b = pop()
+                stack[-1] = stack[-1] - b
+            elif op == MUL:
+                b = pop()
+                stack[-1] = stack[-1] * b
+            elif op == DIV:
+                b = pop()
+                # 只检查标量；数组（如 NumPy）按其自身的除法语义得到 inf / nan
+                if getattr(b, 'ndim', 0) == 0 and b == 0:
+                    raise EvaluationError("求值错误：除以零")
+                stack[-1] = stack[-1] / b
+            else:
+                values[arg] = stack[-1]
+        return stack[-1]
+
+    def evaluate(self, env):
+        """
+        在变量环境 env（变量名 -> 值）中求值，返回表达式的值
+        赋值语句的结果写回 env
+        """
+        values = []
+        for name in self.variables[:self.inputs]:
+            if name not in env:
+                raise EvaluationError(f"求值错误：未定义的变量 '{name}'")
+            values.append(env[name])
+        # 只被赋值、不被读取的目标变量可以事先未定义
+        values.extend([None] * (len(self.variables) - self.inputs))
+        result = self.run(values)
+        if self.target is not None:
+            env[self.target] = result
+        return result
+
+    def disassemble(self):
+        """指令序列的可读形式"""
+        lines = []
+        for i, (op, arg) in enumerate(self.code):
+            if op == LOAD_VAR or op == STORE_VAR:
+                lines.append(f"{i:4d}  {OPCODE_NAMES[op]:<10} {arg} ({self.variables[arg]})")
+            elif op == LOAD_CONST:
+                lines.append(f"{i:4d}  {OPCODE_NAMES[op]:<10} {arg!r}")
+            else:
+                lines.append(f"{i:4d}  {OPCODE_NAMES[op]}")
+        return "\n".join(lines)
+
+
+def compile_ast(tree):
+    """
+    把语法树编译为 CompiledExpression
+    用显式栈做后序遍历，深层嵌套的表达式不受递归深度限制
+    """
+    code = []
+    slots = {}
+    target = None
+
+    def slot(name):
+        index = slots.get(name)
+        if index is None:
+            index = slots[name] = len(slots)
+        return index
+
+    if isinstance(tree, Assign):
+        target = tree.name
+        root = tree.value
+    else:
+        root = tree
+
+    depth = 0
+    max_stack = 0
+    # 栈元素为 (结点, 子结点是否已展开)
+    work = [(root, False)]
+    while work:
+        node, expanded = work.pop()
+        if isinstance(node, BinOp):
+            if expanded:
+                code.append((_BINARY_OPCODES[node.op], None))
+                depth -= 1
+            else:
+                work.append((node, True))
+                work.append((node.right, False))
+                work.append((node.left, False))
+            continue
+        if isinstance(node, Num):
+            code.append((LOAD_CONST, node.value))
+        else:
+            code.append((LOAD_VAR, slot(node.name)))
+        depth += 1
+        max_stack = max(max_stack, depth)
+
+    inputs = len(slots)
+    if target is not None:
+        code.append((STORE_VAR, slot(target)))
+
+    variables = [None] * len(slots)
+    for name, index in slots.items():
+        variables[index] = name
+    return CompiledExpression(code, variables, inputs, target, max_stack)
+
+
+def compile_expression(input_string):
+    """分析、常量折叠并编译输入串（如 "x=3+5*2#"）"""
+    return compile_ast(fold_constants(parse_ast(input_string)))
+
+
+def test_compiler():
+    """编译并求值几个示例"""
+    examples = [
+        ("x=3+5*2#", {}),
+        ("(a+b)*(c-d)#", {'a': 1, 'b': 2, 'c': 10, 'd': 4}),
+        ("result = (num1 + num2) * num3 / num4#", {'num1': 1, 'num2': 2, 'num3': 3, 'num4': 4}),
+    ]
+
+    print("=" * 80)
+    print("语法树构造、编译与求值")
+    print("=" * 80)
+
+    for text, env in examples:
+        program = compile_expression(text)
+        print(f"\n输入: {text}")
+        print("语法树:")
+        print(format_ast(parse_ast(text)))
+        print("指令:")
+        print(program.disassemble())
+        print(f"求值: {program.evaluate(env)}    环境: {env}")
+
+
+if __name__ == "__main__":
+    test_compiler()
@@ -11,7 +11,9 @@ GUI_CONFIG = {
     "grammar_fg_color": '#00FF00',
     "input_font": ('Courier', 11),
     "result_font": ('Courier', 10),
-    "error_color": 'red'
+    "error_color": 'red',
+    "trace_page_size": 2000,  # 分析过程每页显示的步骤数
+    "stream_chunk_lines": 200  # 长文本分批插入文本框时每批的行数
 }
 
 # 示例输入数据
@@ -4,8 +4,12 @@
 """
 
 import re
+import time
+from itertools import product
 from typing import List, Dict, Set, Tuple, Optional
 
+from grammar_reader import GrammarData, read_grammar, read_grammar_file
+
 
 class Production:
     """产生式类"""
@@ -23,22 +27,66 @@ class Production:
 class Grammar:
     """文法类"""
     def __init__(self):
-        self.productions: List[Production] = []
+        # 产生式索引：非终结符 -> 该非终结符的产生式（按加入顺序），非终结符按首次出现的顺序排列
+        self.production_map: Dict[str, List[Production]] = {}
         self.nonterminals: Set[str] = set()
         self.terminals: Set[str] = set()
         self.start_symbol: Optional[str] = None
     
+    @property
+    def productions(self) -> List[Production]:
+        """全部产生式（按非终结符分组）"""
+        return [prod for prods in self.production_map.values() for prod in prods]
+    
+    @productions.setter
+    def productions(self, productions: List[Production]):
+        """整体替换产生式，重建索引"""
+        self.production_map = {}
+        self.nonterminals = set()
+        for prod in productions:
+            self.add_production(prod.left, prod.right)
+    
     def add_production(self, left: str, right: List[str]):
         """添加产生式"""
         production = Production(left, right)
-        self.productions.append(production)
-        self.nonterminals.add(left)
-        
+        prods = self.production_map.get(left)
+        if prods is None:
+            prods = self.production_map[left] = []
+            self.nonterminals.add(left)
+        prods.append(production)
+        self._add_terminals(right)
+    
+    def _add_terminals(self, right: List[str]):
         # 识别终结符和非终结符
         for symbol in right:
             if symbol != 'ε' and not self._is_nonterminal(symbol):
                 self.terminals.add(symbol)
     
+    def set_productions(self, nonterminal: str, productions: List[Production]):
+        """用 productions 替换 nonterminal 的全部产生式，O(k)；列表为空时删除该非终结符"""
+        if not productions:
+            self.remove_productions(nonterminal)
+            return
+        if nonterminal not in self.production_map:
+            self.nonterminals.add(nonterminal)
+        self.production_map[nonterminal] = list(productions)
+        for prod in productions:
+            self._add_terminals(prod.right)
+    
+    def remove_productions(self, nonterminal: str):
+        """删除 nonterminal 的全部产生式"""
+        if self.production_map.pop(nonterminal, None) is not None:
+            self.nonterminals.discard(nonterminal)
+    
+    def copy(self) -> 'Grammar':
+        """复制文法（产生式对象共享，右部列表不会被原地修改）"""
+        grammar = Grammar()
+        grammar.production_map = {A: list(prods) for A, prods in self.production_map.items()}
+        grammar.nonterminals = set(self.nonterminals)
+        grammar.terminals = set(self.terminals)
+        grammar.start_symbol = self.start_symbol
+        return grammar
+    
     def _is_nonterminal(self, symbol: str) -> bool:
         """判断是否为非终结符（大写字母开头）"""
         if not symbol:
@@ -47,8 +95,8 @@ class Grammar:
         return symbol[0].isupper() and not symbol.isdigit()
     
     def get_productions_for(self, nonterminal: str) -> List[Production]:
-        """获取指定非终结符的所有产生式"""
-        return [p for p in self.productions if p.left == nonterminal]
+        """获取指定非终结符的所有产生式（O(1)，返回的列表只读）"""
+        return self.production_map.get(nonterminal, [])
     
     def has_left_recursion(self, nonterminal: str) -> bool:
         """检测指定非终结符是否有左递归"""
@@ -59,29 +107,196 @@ class Grammar:
         return False
     
     def has_indirect_left_recursion(self, nonterminal: str) -> bool:
-        """检测间接左递归"""
-        # 使用深度优先搜索检测间接左递归
+        """检测（直接或间接）左递归：在左角图中从 nonterminal 出发能否回到自身"""
+        graph = self.left_corner_graph()
         visited = set()
-        return self._dfs_left_recursion(nonterminal, nonterminal, visited)
+        stack = [nonterminal]
+        while stack:
+            current = stack.pop()
+            for target, _ in graph.get(current, []):
+                if target == nonterminal:
+                    return True
+                if target not in visited:
+                    visited.add(target)
+                    stack.append(target)
+        return False
     
-    def _dfs_left_recursion(self, start: str, current: str, visited: Set[str]) -> bool:
-        """深度优先搜索检测间接左递归"""
-        if current in visited:
-            return False  # 避免循环
+    def nullable_nonterminals(self) -> Set[str]:
+        """
+        可空非终结符（能推导出 ε）
+        工作表算法：记录每条产生式右部尚未确认可空的符号数，降为 0 时左部可空，总代价 O(文法大小)
+        """
+        remaining: Dict[int, int] = {}
+        occurrences: Dict[str, List[Production]] = {}
+        nullable: Set[str] = set()
+        worklist: List[str] = []
         
-        visited.add(current)
-        productions = self.get_productions_for(current)
+        for prods in self.production_map.values():
+            for prod in prods:
+                symbols = [X for X in prod.right if X != 'ε']
+                if any(X not in self.nonterminals for X in symbols):
+                    continue  # 含终结符（或无产生式的符号），不可能为空
+                remaining[id(prod)] = len(symbols)
+                for X in symbols:
+                    occurrences.setdefault(X, []).append(prod)
+                if not symbols and prod.left not in nullable:
+                    nullable.add(prod.left)
+                    worklist.append(prod.left)
         
-        for prod in productions:
-            if prod.right:  # 非空产生式
-                first_symbol = prod.right[0]
-                if first_symbol == start:
-                    return True  # 找到间接左递归
-                elif first_symbol in self.nonterminals:
-                    if self._dfs_left_recursion(start, first_symbol, visited.copy()):
-                        return True
+        while worklist:
+            X = worklist.pop()
+            for prod in occurrences.get(X, []):
+                remaining[id(prod)] -= 1
+                if remaining[id(prod)] == 0 and prod.left not in nullable:
+                    nullable.add(prod.left)
+                    worklist.append(prod.left)
+        return nullable
+    
+    def epsilon_only_nonterminals(self, nullable: Optional[Set[str]] = None) -> Set[str]:
+        """只能推导出 ε 的非终结符：可空，且不能推导出任何非空串"""
+        if nullable is None:
+            nullable = self.nullable_nonterminals()
+        # 能推导出非空串：某条产生式含终结符，或含能推导出非空串的非终结符
+        nonempty: Set[str] = set()
+        changed = True
+        while changed:
+            changed = False
+            for A, prods in self.production_map.items():
+                if A in nonempty:
+                    continue
+                for prod in prods:
+                    if any(X != 'ε' and (X not in self.production_map or X in nonempty) for X in prod.right):
+                        nonempty.add(A)
+                        changed = True
+                        break
+        return nullable - nonempty
+    
+    def left_corner_graph(self, nullable: Optional[Set[str]] = None) -> Dict[str, List[Tuple[str, Production]]]:
+        """
+        左角图：A -> α B β 且 α 可空时有边 A → B（边上记录产生式）
+        考虑可空前缀，A -> B A（B 可空）这类隐藏的左递归也能被发现
+        """
+        if nullable is None:
+            nullable = self.nullable_nonterminals()
+        graph: Dict[str, List[Tuple[str, Production]]] = {A: [] for A in self.production_map}
+        for A, prods in self.production_map.items():
+            for prod in prods:
+                for X in prod.right:
+                    if X == 'ε':
+                        continue
+                    if X in self.nonterminals:
+                        graph[A].append((X, prod))
+                    if X not in nullable:
+                        break
+        return graph
+    
+    def strongly_connected_components(self, graph: Dict[str, List[Tuple[str, Production]]]) -> List[List[str]]:
+        """Tarjan 算法求强连通分量（显式栈实现，O(V+E)），分量按逆拓扑序给出"""
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        counter = 0
         
-        return False
+        for root in graph:
+            if root in index:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            # 调用栈元素：(结点, 下一条待访问边的下标)
+            call_stack = [(root, 0)]
+            while call_stack:
+                v, i = call_stack[-1]
+                edges = graph[v]
+                if i < len(edges):
+                    call_stack[-1] = (v, i + 1)
+                    w = edges[i][0]
+                    if w not in index:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack.add(w)
+                        call_stack.append((w, 0))
+                    elif w in on_stack:
+                        low[v] = min(low[v], index[w])
+                    continue
+                
+                call_stack.pop()
+                if call_stack:
+                    parent = call_stack[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+        return components
+    
+    def find_left_recursion(self) -> Dict:
+        """
+        一次性检测整个文法的左递归：建左角图 → Tarjan 求强连通分量，总代价 O(V+E)
+        返回：
+            nullable      : 可空非终结符
+            components    : 含左递归的强连通分量（自环的单点或多于一个结点）
+            direct        : 有直接左递归（左角图自环，含可空前缀）的非终结符
+            indirect      : 只有间接左递归的非终结符
+            left_recursive: 所有左递归非终结符
+            cycles        : 每个分量一条见证环，如 ['S', 'A', 'S']
+        """
+        nullable = self.nullable_nonterminals()
+        graph = self.left_corner_graph(nullable)
+        
+        direct = [A for A, edges in graph.items() if any(B == A for B, _ in edges)]
+        direct_set = set(direct)
+        order = {A: i for i, A in enumerate(self.production_map)}
+        
+        components = []
+        for component in self.strongly_connected_components(graph):
+            if len(component) > 1 or component[0] in direct_set:
+                components.append(sorted(component, key=order.__getitem__))
+        components.sort(key=lambda c: order[c[0]])
+        
+        left_recursive: Set[str] = set()
+        cycles = []
+        for component in components:
+            left_recursive.update(component)
+            cycles.append(self._witness_cycle(graph, component))
+        
+        indirect = [A for A in self.production_map if A in left_recursive and A not in direct_set]
+        return {
+            'nullable': nullable,
+            'components': components,
+            'direct': direct,
+            'indirect': indirect,
+            'left_recursive': left_recursive,
+            'cycles': cycles,
+        }
+    
+    def _witness_cycle(self, graph: Dict[str, List[Tuple[str, Production]]], component: List[str]) -> List[str]:
+        """在强连通分量内用 BFS 找一条经过 component[0] 的最短环"""
+        root = component[0]
+        members = set(component)
+        parent: Dict[str, str] = {}
+        queue = [root]
+        for v in queue:
+            for w, _ in graph[v]:
+                if w == root:
+                    path = [v]
+                    while path[-1] != root:
+                        path.append(parent[path[-1]])
+                    path.reverse()
+                    return path + [root]
+                if w in members and w not in parent:
+                    parent[w] = v
+                    queue.append(w)
+        return [root]
     
     def eliminate_left_recursion(self, nonterminal: str) -> List[Production]:
         """消除指定非终结符的左递归"""
@@ -101,12 +316,7 @@ class Grammar:
             return []  # 没有左递归，无需处理
         
         # 创建新的非终结符，避免命名冲突
-        base_name = nonterminal.rstrip("'")
-        counter = 1
-        new_nonterminal = f"{base_name}'"
-        while new_nonterminal in self.nonterminals:
-            counter += 1
-            new_nonterminal = f"{base_name}'{counter}"
+        new_nonterminal = self._fresh_nonterminal(nonterminal)
         
         # 生成新的产生式
         new_productions = []
@@ -136,15 +346,10 @@ class Grammar:
     
     def eliminate_all_left_recursion(self) -> 'Grammar':
         """消除所有左递归（使用标准算法）"""
-        new_grammar = Grammar()
-        new_grammar.start_symbol = self.start_symbol
+        new_grammar = self.copy()
         
-        # 复制所有产生式
-        for prod in self.productions:
-            new_grammar.add_production(prod.left, prod.right)
-        
-        # 按顺序处理每个非终结符
-        nonterminals = list(self.nonterminals)
+        # 按产生式出现的顺序处理每个非终结符（集合的迭代顺序不确定）
+        nonterminals = list(self.production_map)
         
         for i, A in enumerate(nonterminals):
             # 对于每个 A_i，处理所有 A_j (j < i) 的替换
@@ -187,32 +392,236 @@ class Grammar:
                             new_A_productions.append(Production(A, new_right))
                     
                     # 更新文法
-                    new_grammar.productions = [p for p in new_grammar.productions if p.left != A]
-                    for prod in new_A_productions:
-                        new_grammar.add_production(prod.left, prod.right)
-                    
-                    # 重新获取 A 的产生式
-                    A_productions = new_grammar.get_productions_for(A)
+                    new_grammar.set_productions(A, new_A_productions)
+                    A_productions = new_A_productions
             
             # 消除 A 的直接左递归
             if new_grammar.has_left_recursion(A):
                 new_productions = new_grammar.eliminate_left_recursion(A)
                 
-                # 删除原有的 A 产生式
-                new_grammar.productions = [p for p in new_grammar.productions if p.left != A]
-                
-                # 添加新的产生式
+                # 替换 A 的产生式，加入新非终结符 A' 的产生式
+                grouped: Dict[str, List[Production]] = {A: []}
                 for prod in new_productions:
-                    new_grammar.add_production(prod.left, prod.right)
+                    grouped.setdefault(prod.left, []).append(prod)
+                for left, prods in grouped.items():
+                    new_grammar.set_productions(left, prods)
         
         return new_grammar
     
+    def _fresh_nonterminal(self, nonterminal: str) -> str:
+        """由 nonterminal 派生一个未使用的新非终结符名：A'、A'2、A'3 ..."""
+        base_name = nonterminal.rstrip("'")
+        counter = 1
+        new_nonterminal = f"{base_name}'"
+        while new_nonterminal in self.nonterminals:
+            counter += 1
+            new_nonterminal = f"{base_name}'{counter}"
+        return new_nonterminal
+    
+    def size(self) -> Dict[str, int]:
+        """文法规模：非终结符数、产生式数、右部符号总数"""
+        return {
+            'nonterminals': len(self.production_map),
+            'productions': sum(len(prods) for prods in self.production_map.values()),
+            'symbols': sum(len(p.right) for prods in self.production_map.values() for p in prods),
+        }
+    
+    # ==================== 左递归消除流水线 ====================
+    
+    def remove_epsilon_productions(self) -> 'Grammar':
+        """
+        消除 ε 产生式：每条产生式对其中的可空非终结符取“保留 / 删除”的所有组合
+        只能推导出 ε 的非终结符在消除后没有产生式，只取“删除”
+        开始符号可空时引入新开始符号 S' -> S | ε
+        """
+        nullable = self.nullable_nonterminals()
+        epsilon_only = self.epsilon_only_nonterminals(nullable)
+        grammar = Grammar()
+        grammar.terminals = set(self.terminals)
+        grammar.start_symbol = self.start_symbol
+        
+        if self.start_symbol in nullable:
+            new_start = self._fresh_nonterminal(self.start_symbol)
+            if self.start_symbol not in epsilon_only:
+                grammar.add_production(new_start, [self.start_symbol])
+            grammar.add_production(new_start, ['ε'])
+            grammar.start_symbol = new_start
+        
+        for A, prods in self.production_map.items():
+            for prod in prods:
+                symbols = [X for X in prod.right if X != 'ε']
+                choices = [((),) if X in epsilon_only else ((X,), ()) if X in nullable else ((X,),)
+                           for X in symbols]
+                for combo in product(*choices):
+                    right = [X for part in combo for X in part]
+                    if right and right != [A]:
+                        grammar.add_production(A, right)
+        return grammar
+    
+    def remove_unit_cycles(self) -> 'Grammar':
+        """
+        消除单产生式环 A -> B -> ... -> A：环上的非终结符等价，合并为其中最先出现的一个，
+        并删除合并后产生的 A -> A
+        """
+        unit_graph: Dict[str, List[Tuple[str, Production]]] = {A: [] for A in self.production_map}
+        for A, prods in self.production_map.items():
+            for prod in prods:
+                if len(prod.right) == 1 and prod.right[0] in self.production_map:
+                    unit_graph[A].append((prod.right[0], prod))
+        
+        order = {A: i for i, A in enumerate(self.production_map)}
+        rename: Dict[str, str] = {}
+        for component in self.strongly_connected_components(unit_graph):
+            if len(component) > 1:
+                representative = min(component, key=order.__getitem__)
+                for A in component:
+                    rename[A] = representative
+        
+        grammar = Grammar()
+        grammar.terminals = set(self.terminals)
+        grammar.start_symbol = rename.get(self.start_symbol, self.start_symbol)
+        for A, prods in self.production_map.items():
+            left = rename.get(A, A)
+            for prod in prods:
+                right = [rename.get(X, X) for X in prod.right] if rename else prod.right
+                if right != [left]:
+                    grammar.add_production(left, right)
+        return grammar
+    
+    def dedupe_productions(self) -> int:
+        """删除重复的产生式（保留第一次出现的），返回删除的条数"""
+        removed = 0
+        for A, prods in self.production_map.items():
+            seen = set()
+            unique = []
+            for prod in prods:
+                key = tuple(prod.right)
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(prod)
+            removed += len(prods) - len(unique)
+            if len(unique) != len(prods):
+                self.production_map[A] = unique
+        return removed
+    
+    def _has_hidden_left_recursion(self, detection: Dict) -> bool:
+        """是否存在经过可空前缀的左递归（只有消除 ε 产生式后才能用代入法消除）"""
+        if not detection['nullable']:
+            return False
+        graph = self.left_corner_graph(detection['nullable'])
+        for component in detection['components']:
+            members = set(component)
+            for A in component:
+                for B, prod in graph[A]:
+                    if B in members and prod.right[0] != B:
+                        return True
+        return False
+    
+    def transform_left_recursion(self, remove_epsilon: Optional[bool] = None, dedupe: bool = True,
+                                 max_productions: Optional[int] = None) -> Tuple['Grammar', Dict]:
+        """
+        左递归消除流水线：
+            1. 消除 ε 产生式（remove_epsilon=None 时只在有经过可空前缀的左递归时进行）
+            2. 消除单产生式环
+            3. 按强连通分量代入：只在含左递归的分量内部按固定顺序做代入和直接左递归消除，
+               其它非终结符保持不变
+            4. 可选：删除重复产生式
+        remove_epsilon=None 且没有消除 ε 产生式时，结果再检测一次左递归：直接左递归消除
+        可能把可空符号移到 A' 右部的开头（如 E -> E T | a、T -> b | ε 得到 E' -> T E' | ε），
+        仍有左递归时先消除 ε 产生式重做。remove_epsilon=False 时不做这一检查。
+        代入法在一个大的强连通分量内可能使产生式数指数增长，max_productions 给出上限，
+        超过时抛出 ValueError。
+        返回 (新文法, 统计信息)；统计信息含输入 / 输出规模、各阶段耗时和总耗时
+        """
+        clock = time.perf_counter
+        started = clock()
+        stats: Dict = {'input': self.size(), 'phases': {}}
+        grammar = self
+        
+        t = clock()
+        detection = self.find_left_recursion()
+        verify = remove_epsilon is None
+        if remove_epsilon is None:
+            remove_epsilon = self._has_hidden_left_recursion(detection)
+        if remove_epsilon:
+            grammar = grammar.remove_epsilon_productions()
+        stats['phases']['消除ε产生式'] = clock() - t
+        
+        t = clock()
+        grammar = grammar.remove_unit_cycles()
+        stats['phases']['消除单产生式环'] = clock() - t
+        
+        t = clock()
+        detection = grammar.find_left_recursion()
+        for component in detection['components']:
+            grammar._eliminate_component(component, dedupe, max_productions)
+        stats['phases']['分量代入'] = clock() - t
+        stats['components'] = len(detection['components'])
+        
+        t = clock()
+        stats['duplicates_removed'] = grammar.dedupe_productions() if dedupe else 0
+        stats['phases']['去重'] = clock() - t
+        
+        stats['epsilon_removed'] = remove_epsilon
+        if verify and not remove_epsilon:
+            t = clock()
+            remaining = grammar.find_left_recursion()['components']
+            stats['phases']['校验'] = clock() - t
+            if remaining:
+                grammar, retry = self.transform_left_recursion(True, dedupe, max_productions)
+                for name, seconds in stats['phases'].items():
+                    retry['phases'][f'首次{name}'] = seconds
+                retry['seconds'] = clock() - started
+                return grammar, retry
+        
+        stats['output'] = grammar.size()
+        stats['seconds'] = clock() - started
+        return grammar, stats
+    
+    def _eliminate_component(self, component: List[str], dedupe: bool = True,
+                             max_productions: Optional[int] = None):
+        """
+        对一个左递归强连通分量原地执行代入法（分量内按 component 的顺序编号）
+        A_i -> A_j γ（j < i）用 A_j 的全部产生式代入，然后消除 A_i 的直接左递归
+        """
+        for i, A in enumerate(component):
+            for j in range(i):
+                A_j = component[j]
+                productions = self.get_productions_for(A)
+                if not any(prod.right and prod.right[0] == A_j for prod in productions):
+                    continue
+                A_j_productions = self.get_productions_for(A_j)
+                new_productions = []
+                for prod in productions:
+                    if not prod.right or prod.right[0] != A_j:
+                        new_productions.append(prod)
+                        continue
+                    gamma = prod.right[1:]
+                    for A_j_prod in A_j_productions:
+                        if A_j_prod.right == ['ε']:
+                            new_right = gamma if gamma else ['ε']
+                        else:
+                            new_right = A_j_prod.right + gamma
+                        new_productions.append(Production(A, new_right))
+                if dedupe:
+                    unique = {}
+                    for prod in new_productions:
+                        unique.setdefault(tuple(prod.right), prod)
+                    new_productions = list(unique.values())
+                if max_productions is not None and len(new_productions) > max_productions:
+                    raise ValueError(f"代入后 {A} 的产生式超过 {max_productions} 条，文法规模膨胀过大")
+                self.set_productions(A, new_productions)
+            
+            if self.has_left_recursion(A):
+                grouped: Dict[str, List[Production]] = {A: []}
+                for prod in self.eliminate_left_recursion(A):
+                    grouped.setdefault(prod.left, []).append(prod)
+                for left, prods in grouped.items():
+                    self.set_productions(left, prods)
+    
     def __str__(self):
         """字符串表示"""
-        result = []
-        for prod in self.productions:
-            result.append(str(prod))
-        return '\n'.join(result)
+        return '\n'.join(str(prod) for prod in self.productions)
 
 
 class GrammarParser:
@@ -220,56 +629,31 @@ class GrammarParser:
     
     @staticmethod
     def parse_grammar(grammar_text: str) -> Grammar:
-        """解析文法文本"""
+        """解析文法文本（格式见 grammar_reader），格式错误抛出 ValueError"""
         if not grammar_text or not grammar_text.strip():
             raise ValueError("文法文本不能为空")
-        
-        grammar = Grammar()
-        lines = grammar_text.strip().split('\n')
-        
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            
-            # 解析产生式 A -> α | β | γ
-            if '->' not in line:
-                raise ValueError(f"第{line_num}行格式错误：缺少 '->' 符号")
-            
-            parts = line.split('->', 1)
-            if len(parts) != 2:
-                raise ValueError(f"第{line_num}行格式错误：'->' 符号使用不当")
-            
-            left, right_part = parts
-            left = left.strip()
-            
-            if not left:
-                raise ValueError(f"第{line_num}行格式错误：左部非终结符不能为空")
-            
-            # 设置开始符号
-            if grammar.start_symbol is None:
-                grammar.start_symbol = left
-            
-            # 解析右部
-            if not right_part.strip():
-                raise ValueError(f"第{line_num}行格式错误：右部不能为空")
-            
-            alternatives = [alt.strip() for alt in right_part.split('|')]
-            
-            for alt in alternatives:
-                if not alt:
-                    raise ValueError(f"第{line_num}行格式错误：产生式右部不能为空")
-                
-                if alt == 'ε':
-                    symbols = ['ε']
-                else:
-                    symbols = alt.split()
-                
-                grammar.add_production(left, symbols)
-        
-        if not grammar.productions:
+        return GrammarParser.build_grammar(read_grammar(grammar_text))
+    
+    @staticmethod
+    def load_grammar_file(path: str) -> Grammar:
+        """逐行读取文法文件"""
+        return GrammarParser.build_grammar(read_grammar_file(path))
+    
+    @staticmethod
+    def build_grammar(data: GrammarData) -> Grammar:
+        """由 grammar_reader 的读取结果直接构造文法（不逐条调用 add_production）"""
+        if not data.rules:
             raise ValueError("文法中没有有效的产生式")
         
+        grammar = Grammar()
+        grammar.production_map = {
+            left: [Production(left, right) for right in alternatives]
+            for left, alternatives in data.rules.items()
+        }
+        grammar.nonterminals = set(data.rules)
+        grammar.terminals = {symbol for symbol in data.symbols
+                             if symbol != 'ε' and not grammar._is_nonterminal(symbol)}
+        grammar.start_symbol = data.start_symbol
         return grammar
     
     @staticmethod
@@ -277,12 +661,8 @@ class GrammarParser:
         """格式化文法输出"""
         result = []
         
-        # 按非终结符分组
-        nonterminal_groups = {}
-        for prod in grammar.productions:
-            if prod.left not in nonterminal_groups:
-                nonterminal_groups[prod.left] = []
-            nonterminal_groups[prod.left].append(prod)
+        # 产生式已按非终结符分组
+        nonterminal_groups = grammar.production_map
         
         for nonterminal in sorted(nonterminal_groups.keys()):
             productions = nonterminal_groups[nonterminal]
@@ -306,6 +686,7 @@ class LeftRecursionAnalyzer:
         self.grammar = None
         self.left_recursive_symbols = set()
         self.indirect_left_recursive_symbols = set()
+        self.transform_stats = None  # 最近一次消除左递归的统计信息
     
     def analyze_grammar(self, grammar_text: str) -> Dict:
         """分析文法的左递归情况"""
@@ -319,31 +700,55 @@ class LeftRecursionAnalyzer:
             'analysis_steps': []
         }
         
-        # 检测直接左递归
-        for nonterminal in self.grammar.nonterminals:
-            if self.grammar.has_left_recursion(nonterminal):
-                self.left_recursive_symbols.add(nonterminal)
-                result['left_recursive_symbols'].append(nonterminal)
-                result['has_left_recursion'] = True
-                result['analysis_steps'].append(f"发现直接左递归: {nonterminal}")
-        
-        # 检测间接左递归
-        for nonterminal in self.grammar.nonterminals:
-            if self.grammar.has_indirect_left_recursion(nonterminal):
-                if nonterminal not in self.left_recursive_symbols:
-                    self.indirect_left_recursive_symbols.add(nonterminal)
-                    result['indirect_left_recursive_symbols'].append(nonterminal)
-                    result['has_left_recursion'] = True
-                    result['analysis_steps'].append(f"发现间接左递归: {nonterminal}")
+        self.left_recursive_symbols = set()
+        self.indirect_left_recursive_symbols = set()
+        
+        # 左角图 + 强连通分量，一次得到全部左递归
+        detection = self.grammar.find_left_recursion()
+        result['components'] = detection['components']
+        result['cycles'] = detection['cycles']
+        result['nullable_symbols'] = sorted(detection['nullable'])
+        
+        # 直接左递归
+        for nonterminal in detection['direct']:
+            self.left_recursive_symbols.add(nonterminal)
+            result['left_recursive_symbols'].append(nonterminal)
+            result['analysis_steps'].append(f"发现直接左递归: {nonterminal}")
+        
+        # 间接左递归
+        for nonterminal in detection['indirect']:
+            self.indirect_left_recursive_symbols.add(nonterminal)
+            result['indirect_left_recursive_symbols'].append(nonterminal)
+            result['analysis_steps'].append(f"发现间接左递归: {nonterminal}")
+        
+        for cycle in detection['cycles']:
+            result['analysis_steps'].append(f"左递归环: {' => '.join(cycle)}")
         
+        result['has_left_recursion'] = bool(detection['left_recursive'])
         return result
     
     def eliminate_left_recursion(self) -> Grammar:
-        """消除左递归"""
+        """消除左递归（流水线：必要时消除 ε 产生式 → 消除单产生式环 → 分量代入 → 去重）"""
         if self.grammar is None:
             raise ValueError("请先分析文法")
         
-        return self.grammar.eliminate_all_left_recursion()
+        grammar, self.transform_stats = self.grammar.transform_left_recursion()
+        return grammar
+    
+    def format_transform_stats(self) -> str:
+        """最近一次消除左递归的规模与耗时"""
+        stats = self.transform_stats
+        if stats is None:
+            return ""
+        before, after = stats['input'], stats['output']
+        lines = [
+            f"非终结符: {before['nonterminals']} → {after['nonterminals']}，"
+            f"产生式: {before['productions']} → {after['productions']}，"
+            f"右部符号: {before['symbols']} → {after['symbols']}",
+            f"左递归分量: {stats['components']}，删除重复产生式: {stats['duplicates_removed']}，"
+            f"耗时: {stats['seconds'] * 1000:.2f} ms",
+        ]
+        return '\n'.join(lines)
 
 
 def test_left_recursion_analyzer():
@@ -370,12 +775,26 @@ def test_left_recursion_analyzer():
     F -> ( E ) | id
     """
     
+    # 测试用例4：直接左递归消除后 E' -> T E'（T 可空）仍有左递归，需要先消除 ε 产生式
+    grammar4 = """
+    E -> E T | a
+    T -> b | ε
+    """
+    
+    # 测试用例5：A 只能推导出 ε，消除 ε 产生式后右部不能再出现 A
+    grammar5 = """
+    S -> A S b | c
+    A -> ε
+    """
+    
     analyzer = LeftRecursionAnalyzer()
     
     test_cases = [
         ("直接左递归文法", grammar1),
         ("间接左递归文法", grammar2),
-        ("无左递归文法", grammar3)
+        ("无左递归文法", grammar3),
+        ("消除后出现可空前缀的文法", grammar4),
+        ("含只能推导出ε的非终结符的文法", grammar5)
     ]
     
     print("=" * 80)
@@ -404,6 +823,13 @@ def test_left_recursion_analyzer():
                 print("\n消除左递归后的文法:")
                 eliminated_grammar = analyzer.eliminate_left_recursion()
                 print(GrammarParser.format_grammar(eliminated_grammar))
+                print(analyzer.format_transform_stats())
+                remaining = eliminated_grammar.find_left_recursion()['cycles']
+                assert not remaining, f"消除后仍有左递归: {remaining}"
+                undefined = {X for prod in eliminated_grammar.productions for X in prod.right
+                             if X != 'ε' and X not in eliminated_grammar.production_map
+                             and X not in eliminated_grammar.terminals}
+                assert not undefined, f"消除后出现未定义的符号: {undefined}"
             
             print("\n分析步骤:")
             for step in result['analysis_steps']:
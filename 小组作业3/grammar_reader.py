@@ -0,0 +1,217 @@
+"""
+文法文件读取
+逐行读取文法文本（字符串、文件对象或文件），一遍完成符号驻留和产生式索引的构造，
+供左递归分析（grammar_analyzer.GrammarParser）和 LL(1) 分析器（小组作业2）共用。
+
+支持的格式：
+    E  -> T E'              箭头可以是 ->、→ 或 ::=
+    E' -> + T E' | ε        | 分隔候选式；ε 表示空串（epsilon_words=True 时 epsilon、empty 也表示空串）
+       | - T E'             以 | 开头的行续接上一条规则
+    # 注释                  以 # 或 // 开头的行为注释
+
+    data = read_grammar_file("grammar.txt")
+    data.start_symbol       # 第一条规则的左部
+    data.rules              # {非终结符: [[符号, ...], ...]}，非终结符按首次出现的顺序排列
+    data.symbols            # 右部出现过的符号（驻留表）
+
+同一个符号在整个文法中只保存一个字符串对象，大文法的内存占用与符号种类数成正比。
+"""
+
+import os
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional, Union
+
+
+EPSILON = 'ε'
+
+# epsilon_words=True 时表示空串的写法（默认只有 ε，以免改变把这两个词用作终结符的文法）
+EPSILON_SPELLINGS = frozenset({'ε', 'epsilon', 'empty'})
+
+# 箭头写法，按查找顺序排列
+ARROWS = ('->', '→', '::=')
+
+COMMENT_PREFIXES = ('#', '//')
+
+
+class GrammarFormatError(ValueError):
+    """文法格式错误（带行号）"""
+
+    def __init__(self, line_num: int, message: str):
+        super().__init__(f"第{line_num}行格式错误：{message}")
+        self.line_num = line_num
+
+
+class GrammarData:
+    """
+    读取结果
+        start_symbol : 开始符号（第一条规则的左部）
+        rules        : 非终结符 -> 候选式列表，每个候选式是符号列表，空串为 [EPSILON]
+        symbols      : 右部出现过的符号 -> 同一个字符串对象（按首次出现的顺序）
+        line_count   : 读取的行数
+        production_count : 候选式总数
+    """
+
+    __slots__ = ('start_symbol', 'rules', 'symbols', 'line_count', 'production_count')
+
+    def __init__(self):
+        self.start_symbol: Optional[str] = None
+        self.rules: Dict[str, List[List[str]]] = {}
+        self.symbols: Dict[str, str] = {}
+        self.line_count = 0
+        self.production_count = 0
+
+    @property
+    def nonterminals(self) -> List[str]:
+        """有产生式的符号（按首次出现的顺序）"""
+        return list(self.rules)
+
+    @property
+    def terminals(self) -> List[str]:
+        """右部出现过、没有产生式的符号（不含 ε）"""
+        rules = self.rules
+        return [s for s in self.symbols if s not in rules and s != EPSILON]
+
+
+def _find_arrow(line: str):
+    """返回 (箭头位置, 箭头长度)，没有箭头时为 (-1, 0)"""
+    for arrow in ARROWS:
+        index = line.find(arrow)
+        if index >= 0:
+            return index, len(arrow)
+    return -1, 0
+
+
+def read_grammar(source: Union[str, Iterable[str]], strict: bool = True,
+                 epsilon_words: bool = False) -> GrammarData:
+    """
+    读取文法文本
+    source 为文法字符串，或逐行产生文本的可迭代对象（如打开的文件）
+    strict=True 时格式错误抛出 GrammarFormatError；
+    strict=False 时跳过无法识别的行，空的候选式视为 ε（与 LL(1) 分析器界面的宽松解析一致）
+    epsilon_words=True 时 epsilon、empty 也表示空串
+    """
+    if isinstance(source, str):
+        source = source.splitlines()
+
+    data = GrammarData()
+    rules = data.rules
+    symbols = data.symbols
+    intern = symbols.setdefault
+    epsilon_spellings = EPSILON_SPELLINGS if epsilon_words else frozenset({EPSILON})
+    epsilon_alt = [EPSILON]
+    left = None          # 当前规则的左部（供 | 续行使用）
+    count = 0
+    line_num = 0
+
+    for line_num, line in enumerate(source, 1):
+        line = line.strip()
+        if not line or line.startswith(COMMENT_PREFIXES):
+            continue
+
+        if line[0] == '|':
+            # 续行：沿用上一条规则的左部
+            if left is None:
+                if strict:
+                    raise GrammarFormatError(line_num, "续行 '|' 之前没有规则")
+                continue
+            right_part = line[1:]
+            alternatives = rules[left]
+        else:
+            index, width = _find_arrow(line)
+            if index < 0:
+                if strict:
+                    raise GrammarFormatError(line_num, "缺少 '->' 符号")
+                left = None
+                continue
+
+            name = line[:index].strip()
+            right_part = line[index + width:]
+            if not name or len(name.split()) > 1:
+                if strict:
+                    raise GrammarFormatError(line_num, "左部非终结符不能为空" if not name
+                                             else f"左部应为单个非终结符：{name}")
+                left = None
+                continue
+            if strict and not right_part.strip():
+                raise GrammarFormatError(line_num, "右部不能为空")
+
+            left = symbols.get(name, name)
+            alternatives = rules.get(left)
+            if alternatives is None:
+                alternatives = rules[left] = []
+            if data.start_symbol is None:
+                data.start_symbol = left
+
+        for alt in right_part.split('|'):
+            words = alt.split()
+            if not words:
+                if strict:
+                    raise GrammarFormatError(line_num, "产生式右部不能为空")
+                alternatives.append(list(epsilon_alt))
+            elif len(words) == 1 and words[0] in epsilon_spellings:
+                alternatives.append(list(epsilon_alt))
+            else:
+                alternatives.append([intern(w, w) for w in words])
+            count += 1
+
+    data.line_count = line_num
+    data.production_count = count
+    return data
+
+
+def read_grammar_file(path: str, strict: bool = True, encoding: str = 'utf-8',
+                      epsilon_words: bool = False) -> GrammarData:
+    """逐行读取文法文件，不把整个文件读入内存"""
+    with open(path, 'r', encoding=encoding) as f:
+        return read_grammar(f, strict=strict, epsilon_words=epsilon_words)
+
+
+def _write_sample_grammar(path: str, nonterminals: int, alternatives: int = 4, rhs_length: int = 5):
+    """生成一个规模可控的文法文件，混合使用各种箭头、续行和注释"""
+    names = [f"N{i}" for i in range(nonterminals)]
+    terminals = [f"t{i}" for i in range(64)]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, name in enumerate(names):
+            if i % 100 == 0:
+                f.write(f"# 第 {i} 组规则\n")
+            alts = []
+            for j in range(alternatives):
+                symbols = []
+                for k in range(rhs_length):
+                    seed = i * 31 + j * 7 + k
+                    if seed % 3 == 0:
+                        symbols.append(names[(i + j + k + 1) % nonterminals])
+                    else:
+                        symbols.append(terminals[seed % len(terminals)])
+                alts.append(' '.join(symbols))
+            arrow = ARROWS[i % 2]
+            f.write(f"{name} {arrow} {' | '.join(alts[:-1])}\n")
+            f.write(f"    | {alts[-1]}\n")
+            if i % 7 == 0:
+                f.write(f"{name} -> ε\n")
+
+
+def benchmark(sizes=(20_000, 80_000, 160_000), repeat=3):
+    """生成不同规模（数 MB）的文法文件并计时读取"""
+    print(f"{'非终结符':>10} {'文件(MB)':>10} {'候选式':>10} {'耗时(ms)':>10} {'MB/s':>8} {'符号数':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f"grammar_{n}.txt")
+            _write_sample_grammar(path, n)
+            megabytes = os.path.getsize(path) / 1e6
+
+            best = float('inf')
+            for _ in range(repeat):
+                t = time.perf_counter()
+                data = read_grammar_file(path)
+                best = min(best, time.perf_counter() - t)
+
+            if len(data.rules) != n:
+                raise RuntimeError(f"读取结果不正确：期望 {n} 个非终结符，实际 {len(data.rules)}")
+            print(f"{n:>10} {megabytes:>10.1f} {data.production_count:>10} "
+                  f"{best * 1000:>10.1f} {megabytes / best:>8.1f} {len(data.symbols):>8}")
+
+
+if __name__ == "__main__":
+    benchmark()
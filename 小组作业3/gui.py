@@ -2,7 +2,10 @@
 递归下降语法分析器 - 图形用户界面
 """
 
+import queue
+import threading
 import tkinter as tk
+from itertools import islice
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 from parser import analyze
 from grammar_analyzer import LeftRecursionAnalyzer, GrammarParser
@@ -21,6 +24,13 @@ class ParserGUI:
         self.root.title(GUI_CONFIG["window_title"])
         self.root.geometry(GUI_CONFIG["window_size"])
         
+        # 后台分析：工作线程把结果放入队列，界面线程用 after() 轮询
+        self._analysis_thread = None
+        self._analysis_job = 0      # 清空输入后，尚未返回的分析结果作废
+        self._grammar_thread = None
+        self._grammar_job = 0
+        self._streams = {}          # 文本框 -> 正在进行的分批插入（after 回调编号）
+        
         # 设置样式
         self.setup_styles()
         
@@ -147,6 +157,27 @@ class ParserGUI:
         process_frame = ttk.Frame(self.notebook)
         self.notebook.add(process_frame, text="分析过程")
         
+        # 分页浏览：分析过程按页渲染，长输入不会一次生成全部文本
+        page_frame = ttk.Frame(process_frame)
+        page_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        self.prev_page_btn = ttk.Button(
+            page_frame,
+            text="上一页",
+            command=lambda: self.show_trace_page(self.trace_page - 1)
+        )
+        self.prev_page_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.next_page_btn = ttk.Button(
+            page_frame,
+            text="下一页",
+            command=lambda: self.show_trace_page(self.trace_page + 1)
+        )
+        self.next_page_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.page_label = ttk.Label(page_frame, text="")
+        self.page_label.pack(side=tk.LEFT, padx=10)
+        
         self.process_text = scrolledtext.ScrolledText(
             process_frame,
             font=('Courier', 10),
@@ -154,6 +185,9 @@ class ParserGUI:
         )
         self.process_text.pack(fill=tk.BOTH, expand=True)
         
+        self.trace = None
+        self.trace_page = 0
+        
         # 错误信息标签页
         error_frame = ttk.Frame(self.notebook)
         self.notebook.add(error_frame, text="错误信息")
@@ -238,7 +272,10 @@ class ParserGUI:
         self.grammar_text.config(state=tk.DISABLED)
     
     def analyze_input(self):
-        """分析输入的字符串"""
+        """分析输入的字符串：词法、语法分析在工作线程中执行"""
+        if self._analysis_thread is not None:
+            return
+        
         input_string = self.input_text.get(1.0, tk.END).strip()
         
         if not input_string:
@@ -250,55 +287,129 @@ class ParserGUI:
             messagebox.showwarning("警告", ERROR_MESSAGES["missing_end_symbol"])
             return
         
-        # 执行分析
-        self.status_bar_label.config(text="正在分析...")
-        self.root.update()
+        results = queue.Queue()
+        job = self._analysis_job
+        
+        def worker():
+            try:
+                results.put(('done', analyze(input_string)))
+            except Exception as e:
+                results.put(('error', str(e)))
         
+        self.status_bar_label.config(text="正在分析...")
+        self.analyze_btn.state(['disabled'])
+        self._analysis_thread = threading.Thread(target=worker, daemon=True)
+        self._analysis_thread.start()
+        self.root.after(50, self._poll_analysis, job, results)
+    
+    def _poll_analysis(self, job, results):
+        """在界面线程中取回分析结果并显示"""
         try:
-            result = analyze(input_string)
-            
-            # 显示状态
-            if result['success']:
-                self.status_label.config(
-                    text=f"✓ 分析成功：{result['message'].upper()}",
-                    style='Success.TLabel'
-                )
-                self.status_bar_label.config(text="分析成功")
-            else:
-                self.status_label.config(
-                    text=f"✗ 分析失败：{result['message'].upper()}",
-                    style='Error.TLabel'
-                )
-                self.status_bar_label.config(text="分析失败")
-            
-            # 显示Token序列
-            self.token_text.delete(1.0, tk.END)
-            if result['tokens']:
-                self.token_text.insert(1.0, "Token序列：\n\n")
-                for i, token in enumerate(result['tokens'], 1):
-                    self.token_text.insert(tk.END, f"{i:3d}. {token}\n")
-            
-            # 显示分析过程
-            self.process_text.delete(1.0, tk.END)
-            if result['parse_tree']:
-                self.process_text.insert(1.0, result['parse_tree'])
-            
-            # 显示错误信息
-            self.error_text.delete(1.0, tk.END)
-            if result['error']:
-                self.error_text.insert(1.0, result['error'])
-            else:
-                self.error_text.insert(1.0, "无错误")
-            
-            # 自动切换到相应标签页
-            if result['success']:
-                self.notebook.select(1)  # 切换到分析过程
-            else:
-                self.notebook.select(2)  # 切换到错误信息
-        
-        except Exception as e:
-            messagebox.showerror("错误", f"分析过程出错：\n{str(e)}")
+            kind, payload = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._poll_analysis, job, results)
+            return
+        
+        self._analysis_thread = None
+        self.analyze_btn.state(['!disabled'])
+        if job != self._analysis_job:
+            return  # 分析期间输入已被清空
+        if kind == 'error':
+            messagebox.showerror("错误", f"分析过程出错：\n{payload}")
             self.status_bar_label.config(text="分析出错")
+            return
+        self.show_result(payload)
+    
+    def show_result(self, result):
+        """显示 parser.analyze 的结果；Token 序列和分析过程分批插入文本框"""
+        # 显示状态
+        if result['success']:
+            self.status_label.config(
+                text=f"✓ 分析成功：{result['message'].upper()}",
+                style='Success.TLabel'
+            )
+            self.status_bar_label.config(text="分析成功")
+        else:
+            self.status_label.config(
+                text=f"✗ 分析失败：{result['message'].upper()}",
+                style='Error.TLabel'
+            )
+            self.status_bar_label.config(text="分析失败")
+        
+        # 显示Token序列
+        self.token_text.delete(1.0, tk.END)
+        if result['tokens']:
+            self.token_text.insert(1.0, "Token序列：\n\n")
+            self.stream_lines(
+                self.token_text,
+                (f"{i:3d}. {token}" for i, token in enumerate(result['tokens'], 1))
+            )
+        else:
+            self.cancel_stream(self.token_text)
+        
+        # 显示分析过程（第一页）
+        self.trace = result['parse_tree'] or None
+        self.show_trace_page(0)
+        
+        # 显示错误信息
+        self.error_text.delete(1.0, tk.END)
+        if result['error']:
+            self.error_text.insert(1.0, result['error'])
+        else:
+            self.error_text.insert(1.0, "无错误")
+        
+        # 自动切换到相应标签页
+        if result['success']:
+            self.notebook.select(1)  # 切换到分析过程
+        else:
+            self.notebook.select(2)  # 切换到错误信息
+    
+    def stream_lines(self, widget, lines):
+        """
+        把 lines（可迭代的文本行）分批追加到 widget 末尾，每批 stream_chunk_lines 行，
+        批与批之间返回事件循环，长文本插入期间界面仍可响应。
+        同一个文本框上未完成的插入会被新的插入取消。
+        """
+        self.cancel_stream(widget)
+        lines = iter(lines)
+        chunk_size = GUI_CONFIG["stream_chunk_lines"]
+        
+        def insert_chunk():
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                self._streams.pop(widget, None)
+                return
+            widget.insert(tk.END, "\n".join(chunk) + "\n")
+            self._streams[widget] = self.root.after(1, insert_chunk)
+        
+        insert_chunk()
+    
+    def cancel_stream(self, widget):
+        """停止 widget 上尚未完成的分批插入"""
+        after_id = self._streams.pop(widget, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+    
+    def show_trace_page(self, index):
+        """渲染并显示分析过程的第 index 页（逐批渲染、插入）"""
+        self.process_text.delete(1.0, tk.END)
+        if self.trace is None:
+            self.cancel_stream(self.process_text)
+            self.page_label.config(text="")
+            return
+        
+        page_size = GUI_CONFIG["trace_page_size"]
+        pages = self.trace.page_count(page_size)
+        self.trace_page = max(0, min(index, pages - 1))
+        start = self.trace_page * page_size
+        trace = self.trace
+        self.stream_lines(
+            self.process_text,
+            (trace.render_event(e) for e in trace.events[start:start + page_size])
+        )
+        self.page_label.config(
+            text=f"第 {self.trace_page + 1}/{pages} 页（共 {len(self.trace)} 步）"
+        )
     
     def load_from_file(self):
         """从文件加载输入"""
@@ -321,9 +432,12 @@ class ParserGUI:
     
     def clear_input(self):
         """清空输入和输出"""
+        self._analysis_job += 1
         self.input_text.delete(1.0, tk.END)
+        self.cancel_stream(self.token_text)
         self.token_text.delete(1.0, tk.END)
-        self.process_text.delete(1.0, tk.END)
+        self.trace = None
+        self.show_trace_page(0)
         self.error_text.delete(1.0, tk.END)
         self.status_label.config(text="等待输入...")
         self.status_bar_label.config(text="就绪")
@@ -366,68 +480,61 @@ class ParserGUI:
         ).pack(pady=10)
     
     def analyze_grammar(self):
-        """分析文法中的左递归"""
+        """分析文法中的左递归：检测与消除在工作线程中执行"""
+        if self._grammar_thread is not None:
+            return
+        
         grammar_text = self.grammar_input_text.get(1.0, tk.END).strip()
         
         if not grammar_text:
             messagebox.showwarning("警告", ERROR_MESSAGES["empty_grammar"])
             return
         
+        results = queue.Queue()
+        job = self._grammar_job
+        
+        def worker():
+            try:
+                results.put(('done', grammar_report(grammar_text)))
+            except Exception as e:
+                results.put(('error', str(e)))
+        
+        self.status_bar_label.config(text="正在分析文法...")
+        self.analyze_grammar_btn.state(['disabled'])
+        self._grammar_thread = threading.Thread(target=worker, daemon=True)
+        self._grammar_thread.start()
+        self.root.after(50, self._poll_grammar, job, results)
+    
+    def _poll_grammar(self, job, results):
+        """在界面线程中取回文法分析报告并分批显示"""
         try:
-            # 创建左递归分析器
-            analyzer = LeftRecursionAnalyzer()
-            result = analyzer.analyze_grammar(grammar_text)
-            
-            # 显示分析结果
-            self.grammar_result_text.delete(1.0, tk.END)
-            
-            # 显示原始文法
-            self.grammar_result_text.insert(tk.END, "原始文法：\n")
-            self.grammar_result_text.insert(tk.END, "=" * 50 + "\n")
-            self.grammar_result_text.insert(tk.END, GrammarParser.format_grammar(result['grammar']) + "\n\n")
-            
-            # 显示左递归检测结果
-            self.grammar_result_text.insert(tk.END, "左递归检测结果：\n")
-            self.grammar_result_text.insert(tk.END, "=" * 50 + "\n")
-            
-            if result['has_left_recursion']:
-                self.grammar_result_text.insert(tk.END, "✓ 发现左递归！\n\n")
-                
-                if result['left_recursive_symbols']:
-                    self.grammar_result_text.insert(tk.END, f"直接左递归符号: {', '.join(result['left_recursive_symbols'])}\n")
-                
-                if result['indirect_left_recursive_symbols']:
-                    self.grammar_result_text.insert(tk.END, f"间接左递归符号: {', '.join(result['indirect_left_recursive_symbols'])}\n")
-                
-                # 显示消除左递归后的文法
-                self.grammar_result_text.insert(tk.END, "\n消除左递归后的文法：\n")
-                self.grammar_result_text.insert(tk.END, "=" * 50 + "\n")
-                
-                eliminated_grammar = analyzer.eliminate_left_recursion()
-                self.grammar_result_text.insert(tk.END, GrammarParser.format_grammar(eliminated_grammar) + "\n")
-                
-            else:
-                self.grammar_result_text.insert(tk.END, "✓ 文法无左递归\n")
-            
-            # 显示分析步骤
-            if result['analysis_steps']:
-                self.grammar_result_text.insert(tk.END, "\n分析步骤：\n")
-                self.grammar_result_text.insert(tk.END, "=" * 50 + "\n")
-                for step in result['analysis_steps']:
-                    self.grammar_result_text.insert(tk.END, f"• {step}\n")
-            
-            # 切换到文法分析标签页
-            # 动态查找文法分析标签页的索引
-            grammar_tab_index = None
-            for i in range(self.notebook.index("end")):
-                if self.notebook.tab(i, "text") == "文法分析":
-                    grammar_tab_index = i
-                    break
-            if grammar_tab_index is not None:
-                self.notebook.select(grammar_tab_index)
-            
-        except Exception as e:
-            messagebox.showerror("错误", f"文法分析出错：\n{str(e)}")
+            kind, payload = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._poll_grammar, job, results)
+            return
+        
+        self._grammar_thread = None
+        self.analyze_grammar_btn.state(['!disabled'])
+        if job != self._grammar_job:
+            return  # 分析期间文法输入已被清空
+        if kind == 'error':
+            messagebox.showerror("错误", f"文法分析出错：\n{payload}")
+            self.status_bar_label.config(text="文法分析出错")
+            return
+        
+        self.grammar_result_text.delete(1.0, tk.END)
+        self.stream_lines(self.grammar_result_text, payload)
+        self.status_bar_label.config(text="文法分析完成")
+        
+        # 切换到文法分析标签页
+        # 动态查找文法分析标签页的索引
+        grammar_tab_index = None
+        for i in range(self.notebook.index("end")):
+            if self.notebook.tab(i, "text") == "文法分析":
+                grammar_tab_index = i
+                break
+        if grammar_tab_index is not None:
+            self.notebook.select(grammar_tab_index)
     
     def load_grammar_example(self):
         """加载文法示例"""
@@ -469,10 +576,63 @@ class ParserGUI:
     
     def clear_grammar_input(self):
         """清空文法输入和结果"""
+        self._grammar_job += 1
         self.grammar_input_text.delete(1.0, tk.END)
+        self.cancel_stream(self.grammar_result_text)
         self.grammar_result_text.delete(1.0, tk.END)
 
 
+def grammar_report(grammar_text):
+    """
+    左递归检测与消除，返回结果报告（文本行列表）
+    不访问任何界面组件，可以在工作线程中调用
+    """
+    analyzer = LeftRecursionAnalyzer()
+    result = analyzer.analyze_grammar(grammar_text)
+    lines = []
+    
+    # 原始文法
+    lines.append("原始文法：")
+    lines.append("=" * 50)
+    lines.extend(GrammarParser.format_grammar(result['grammar']).split("\n"))
+    lines.append("")
+    
+    # 左递归检测结果
+    lines.append("左递归检测结果：")
+    lines.append("=" * 50)
+    
+    if result['has_left_recursion']:
+        lines.append("✓ 发现左递归！")
+        lines.append("")
+        
+        if result['left_recursive_symbols']:
+            lines.append(f"直接左递归符号: {', '.join(result['left_recursive_symbols'])}")
+        
+        if result['indirect_left_recursive_symbols']:
+            lines.append(f"间接左递归符号: {', '.join(result['indirect_left_recursive_symbols'])}")
+        
+        # 消除左递归后的文法
+        lines.append("")
+        lines.append("消除左递归后的文法：")
+        lines.append("=" * 50)
+        
+        eliminated_grammar = analyzer.eliminate_left_recursion()
+        lines.extend(GrammarParser.format_grammar(eliminated_grammar).split("\n"))
+        lines.extend(analyzer.format_transform_stats().split("\n"))
+    else:
+        lines.append("✓ 文法无左递归")
+    
+    # 分析步骤
+    if result['analysis_steps']:
+        lines.append("")
+        lines.append("分析步骤：")
+        lines.append("=" * 50)
+        for step in result['analysis_steps']:
+            lines.append(f"• {step}")
+    
+    return lines
+
+
 def main():
     """主函数"""
     root = tk.Tk()
@@ -4,6 +4,8 @@
 """
 
 import re
+import sys
+from array import array
 from enum import Enum, auto
 
 # 邵昱铭
@@ -25,7 +27,9 @@ class TokenType(Enum):
 
 
 class Token:
-    """Token类，表示一个单词"""
+    """Token类，表示一个单词（使用 __slots__，不为每个实例分配 __dict__）"""
+    __slots__ = ('type', 'value', 'position')
+    
     def __init__(self, token_type, value, position):
         self.type = token_type
         self.value = value
@@ -38,11 +42,78 @@ class Token:
         return f"<{self.type.name}, {self.value}>"
 
 
+# 越过输入末尾时共用的 EOF Token，避免每次都新建对象
+EOF_TOKEN = Token(TokenType.EOF, '', -1)
+
+# TokenBuffer 中类型编号与 TokenType 的对应关系
+_TOKEN_TYPES = list(TokenType)
+_TOKEN_TYPE_CODES = {t: i for i, t in enumerate(_TOKEN_TYPES)}
+
+
+class TokenBuffer:
+    """
+    按列存储的Token序列（structure of arrays）
+    类型编号存入 array('B')，位置存入 array('q')，单词文本放在列表中并做驻留，
+    每个Token只占十几个字节；按下标访问时才临时构造 Token 对象，
+    可以直接交给 Parser 使用。
+    """
+    __slots__ = ('types', 'values', 'positions')
+    
+    def __init__(self):
+        self.types = array('B')
+        self.values = []
+        self.positions = array('q')
+    
+    def append(self, token):
+        """追加一个Token（只保存它的三个字段）"""
+        self.types.append(_TOKEN_TYPE_CODES[token.type])
+        self.values.append(sys.intern(token.value))
+        self.positions.append(token.position)
+    
+    def type_at(self, index):
+        """不构造Token，直接取第 index 个Token的类型"""
+        return _TOKEN_TYPES[self.types[index]]
+    
+    def __len__(self):
+        return len(self.types)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Token(_TOKEN_TYPES[self.types[index]], self.values[index], self.positions[index])
+    
+    def __iter__(self):
+        for code, value, position in zip(self.types, self.values, self.positions):
+            yield Token(_TOKEN_TYPES[code], value, position)
+
+
+# 扫描用的预编译正则：只负责找出单词的结束位置，单词文本最后一次性切片得到
+# \s 与 str.isspace()、\w 与 str.isalnum() 或 '_' 的判定完全一致
+_WHITESPACE = re.compile(r'\s*')
+_WORD_TAIL = re.compile(r'\w*')
+# ASCII 数字的快速路径；其它 str.isdigit() 为真的字符逐个补扫
+_ASCII_DIGITS = re.compile(r'[0-9]*')
+
+# 单字符运算符和分隔符
+_SINGLE_CHAR_TOKENS = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULT,
+    '/': TokenType.DIV,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '=': TokenType.ASSIGN,
+    ';': TokenType.SEMICOLON,
+    '#': TokenType.END,
+}
+
+
 class Lexer:
     """词法分析器"""
     
     def __init__(self, text):
         self.text = text
+        self.length = len(text)
         self.pos = 0
         self.current_char = self.text[0] if text else None
         self.tokens = []
@@ -54,7 +125,7 @@ class Lexer:
     def advance(self):
         """向前移动指针"""
         self.pos += 1
-        if self.pos >= len(self.text):
+        if self.pos >= self.length:
             self.current_char = None
         else:
             self.current_char = self.text[self.pos]
@@ -70,7 +141,8 @@ class Lexer:
             # 单行注释
             while self.current_char is not None and self.current_char != '\n':
                 self.advance()
-            self.advance()
+            if self.current_char is not None:
+                self.advance()
         elif self.current_char == '/' and self.peek() == '*':
             # 多行注释
             self.advance()  # skip /
@@ -85,41 +157,45 @@ class Lexer:
     def peek(self):
         """查看下一个字符但不移动指针"""
         peek_pos = self.pos + 1
-        if peek_pos >= len(self.text):
+        if peek_pos >= self.length:
             return None
         return self.text[peek_pos]
     
+    def _jump(self, pos):
+        """将指针直接移动到 pos"""
+        self.pos = pos
+        self.current_char = self.text[pos] if pos < self.length else None
+    
+    def _scan_digits(self, pos):
+        """返回从 pos 开始的连续数字的结束位置"""
+        text, n = self.text, self.length
+        end = _ASCII_DIGITS.match(text, pos).end()
+        while end < n and text[end].isdigit():
+            end = _ASCII_DIGITS.match(text, end + 1).end()
+        return end
+    
     def number(self):
         """识别数字"""
         # 肖宇航
         start_pos = self.pos
-        result = ''
-        while self.current_char is not None and self.current_char.isdigit():
-            result += self.current_char
-            self.advance()
+        end = self._scan_digits(start_pos)
         
         # 支持小数
-        if self.current_char == '.':
-            result += self.current_char
-            self.advance()
-            while self.current_char is not None and self.current_char.isdigit():
-                result += self.current_char
-                self.advance()
+        if end < self.length and self.text[end] == '.':
+            end = self._scan_digits(end + 1)
         
-        return Token(TokenType.NUM, result, start_pos)
+        self._jump(end)
+        return Token(TokenType.NUM, self.text[start_pos:end], start_pos)
     
     def identifier(self):
         """识别标识符或关键字"""
         start_pos = self.pos
-        result = ''
         
         # 标识符：字母或下划线开头，后接字母、数字或下划线
-        while (self.current_char is not None and 
-               (self.current_char.isalnum() or self.current_char == '_')):
-            result += self.current_char
-            self.advance()
+        end = _WORD_TAIL.match(self.text, start_pos).end()
         
-        return Token(TokenType.ID, result, start_pos)
+        self._jump(end)
+        return Token(TokenType.ID, self.text[start_pos:end], start_pos)
     
     def get_next_token(self):
         """获取下一个Token"""
@@ -188,20 +264,83 @@ class Lexer:
         # 文件结束
         return Token(TokenType.EOF, '', self.pos)
     
+    def iter_tokens(self):
+        """
+        逐个产生Token的生成器（与 get_next_token 识别规则相同）
+        先用正则或下标扫描确定单词的起止位置，再对 self.text 切片一次，
+        不逐字符拼接字符串，也不累积 Token 列表。
+        产生 END 或 EOF 后结束；遇到未识别字符时抛出词法错误。
+        扫描过程中只同步 self.pos，结束或出错时再同步 current_char。
+        """
+        text, n = self.text, self.length
+        pos = self.pos
+        skip_whitespace = _WHITESPACE.match
+        word_tail = _WORD_TAIL.match
+        single_char_tokens = _SINGLE_CHAR_TOKENS
+        # 枚举成员的属性查找较慢，循环前取到局部变量
+        NUM, ID, END = TokenType.NUM, TokenType.ID, TokenType.END
+        
+        while True:
+            if pos < n and text[pos].isspace():
+                pos = skip_whitespace(text, pos).end()
+            if pos >= n:
+                self._jump(pos)
+                yield Token(TokenType.EOF, '', pos)
+                return
+            
+            ch = text[pos]
+            
+            # 跳过注释
+            if ch == '/' and pos + 1 < n and text[pos + 1] in '/*':
+                if text[pos + 1] == '/':
+                    end = text.find('\n', pos + 2)
+                    pos = n if end < 0 else end + 1
+                else:
+                    end = text.find('*/', pos + 2)
+                    pos = n if end < 0 else end + 2
+                continue
+            
+            # 数字
+            if ch.isdigit():
+                end = self._scan_digits(pos)
+                if end < n and text[end] == '.':
+                    end = self._scan_digits(end + 1)
+                token = Token(NUM, text[pos:end], pos)
+            
+            # 标识符
+            elif ch.isalpha() or ch == '_':
+                end = word_tail(text, pos).end()
+                token = Token(ID, text[pos:end], pos)
+            
+            # 运算符和分隔符
+            else:
+                token_type = single_char_tokens.get(ch)
+                if token_type is None:
+                    self._jump(pos)
+                    raise Exception(f"词法错误：未识别的字符 '{ch}' at position {pos}")
+                end = pos + 1
+                token = Token(token_type, ch, pos)
+                if token_type is END:
+                    self._jump(end)
+                    yield token
+                    return
+            
+            pos = self.pos = end
+            yield token
+    
     def tokenize(self):
         """将整个输入串转换为Token列表"""
         self.tokens = []
-        while True:
-            token = self.get_next_token()
+        for token in self.iter_tokens():
             self.tokens.append(token)
-            
-            if token.type == TokenType.ERROR:
-                raise Exception(f"词法错误：未识别的字符 '{token.value}' at position {token.position}")
-            
-            if token.type in (TokenType.END, TokenType.EOF):
-                break
-        
         return self.tokens
+    
+    def tokenize_buffer(self):
+        """将整个输入串转换为紧凑的 TokenBuffer（适合超长输入）"""
+        buffer = TokenBuffer()
+        for token in self.iter_tokens():
+            buffer.append(token)
+        return buffer
 
 
 def test_lexer():
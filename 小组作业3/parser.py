@@ -8,9 +8,156 @@
     Term -> Factor Term'
     Term' -> MULT Factor Term' | DIV Factor Term' | ε
     Factor -> LPAREN Expr RPAREN | ID | NUM
+
+多语句模式（parse_program）：
+    Program -> Statement { SEMICOLON Statement } [SEMICOLON] END
 """
 
-from lexer import Token, TokenType, Lexer
+from array import array
+
+from lexer import Token, TokenType, Lexer, EOF_TOKEN
+
+
+# ==================== 分析过程跟踪 ====================
+# 跟踪时只记录紧凑的事件编码：事件 = (参数 << EVENT_SHIFT) | 事件码，
+# 可读文本由 ParseTrace 在显示时才渲染（可以只渲染一页）。
+
+EVENT_SHIFT = 6
+EVENT_MASK = (1 << EVENT_SHIFT) - 1
+
+# 事件码；EV_TEXT 的参数为自由文本的下标，EV_MATCH 为 Token 下标，EV_PROGRAM_OK 为语句数
+EV_TEXT = 0
+EV_MATCH = 1
+EV_PROGRAM_OK = 2
+EV_FAIL = 3
+EV_START = 4
+EV_PROGRAM = 5
+EV_OK = 6
+EV_ENTER_STATEMENT = 7
+EV_STATEMENT_ASSIGN = 8
+EV_STATEMENT_EXPR = 9
+EV_EXIT_STATEMENT = 10
+EV_ENTER_EXPR = 11
+EV_EXPR = 12
+EV_EXIT_EXPR = 13
+EV_ENTER_EXPR_PRIME = 14
+EV_EXPR_PLUS = 15
+EV_EXPR_MINUS = 16
+EV_EXPR_EPSILON = 17
+EV_EXIT_EXPR_PRIME = 18
+EV_ENTER_TERM = 19
+EV_TERM = 20
+EV_EXIT_TERM = 21
+EV_ENTER_TERM_PRIME = 22
+EV_TERM_MULT = 23
+EV_TERM_DIV = 24
+EV_TERM_EPSILON = 25
+EV_EXIT_TERM_PRIME = 26
+EV_ENTER_FACTOR = 27
+EV_FACTOR_PAREN = 28
+EV_FACTOR_ID = 29
+EV_FACTOR_NUM = 30
+EV_EXIT_FACTOR = 31
+EV_START_PROGRAM = 32
+EV_PROGRAM_LIST = 33
+
+_EVENT_MESSAGES = {
+    EV_FAIL: "✗ 语法分析失败",
+    EV_PROGRAM_OK: "✓ 语法分析成功！共 {} 条语句",
+    EV_START: '开始语法分析',
+    EV_PROGRAM: '应用产生式: Program -> Statement END',
+    EV_OK: '✓ 语法分析成功！',
+    EV_ENTER_STATEMENT: '进入 Statement',
+    EV_STATEMENT_ASSIGN: '应用产生式: Statement -> ID ASSIGN Expr',
+    EV_STATEMENT_EXPR: '应用产生式: Statement -> Expr',
+    EV_EXIT_STATEMENT: '退出 Statement',
+    EV_ENTER_EXPR: '进入 Expr',
+    EV_EXPR: "应用产生式: Expr -> Term Expr'",
+    EV_EXIT_EXPR: '退出 Expr',
+    EV_ENTER_EXPR_PRIME: "进入 Expr'",
+    EV_EXPR_PLUS: "应用产生式: Expr' -> PLUS Term Expr'",
+    EV_EXPR_MINUS: "应用产生式: Expr' -> MINUS Term Expr'",
+    EV_EXPR_EPSILON: "应用产生式: Expr' -> ε",
+    EV_EXIT_EXPR_PRIME: "退出 Expr'",
+    EV_ENTER_TERM: '进入 Term',
+    EV_TERM: "应用产生式: Term -> Factor Term'",
+    EV_EXIT_TERM: '退出 Term',
+    EV_ENTER_TERM_PRIME: "进入 Term'",
+    EV_TERM_MULT: "应用产生式: Term' -> MULT Factor Term'",
+    EV_TERM_DIV: "应用产生式: Term' -> DIV Factor Term'",
+    EV_TERM_EPSILON: "应用产生式: Term' -> ε",
+    EV_EXIT_TERM_PRIME: "退出 Term'",
+    EV_ENTER_FACTOR: '进入 Factor',
+    EV_FACTOR_PAREN: '应用产生式: Factor -> LPAREN Expr RPAREN',
+    EV_FACTOR_ID: '应用产生式: Factor -> ID',
+    EV_FACTOR_NUM: '应用产生式: Factor -> NUM',
+    EV_EXIT_FACTOR: '退出 Factor',
+    EV_START_PROGRAM: '开始语法分析（多语句模式）',
+    EV_PROGRAM_LIST: '应用产生式: Program -> Statement { SEMICOLON Statement } END',
+}
+
+
+class ParseTrace:
+    """分析过程记录：保存事件编码，按需渲染为文本"""
+    
+    __slots__ = ('events', 'texts', 'tokens')
+    
+    def __init__(self, tokens):
+        self.events = array('q')
+        self.texts = []   # log_step 记录的自由文本
+        self.tokens = tokens
+    
+    def add_text(self, text):
+        self.events.append(len(self.texts) << EVENT_SHIFT | EV_TEXT)
+        self.texts.append(text)
+    
+    def render_event(self, event):
+        """把一个事件渲染为一行文本"""
+        code = event & EVENT_MASK
+        arg = event >> EVENT_SHIFT
+        if code == EV_MATCH:
+            token = self.tokens[arg]
+            return f"匹配 {token.type.name}: '{token.value}'"
+        if code == EV_TEXT:
+            return self.texts[arg]
+        if code == EV_PROGRAM_OK:
+            return _EVENT_MESSAGES[code].format(arg)
+        return _EVENT_MESSAGES[code]
+    
+    def render(self, start=0, stop=None):
+        """渲染 [start, stop) 范围内的步骤，返回字符串列表"""
+        return [self.render_event(e) for e in self.events[start:stop]]
+    
+    def page(self, index, size):
+        """第 index 页（每页 size 行）的文本"""
+        return "\n".join(self.render(index * size, (index + 1) * size))
+    
+    def page_count(self, size):
+        return max(1, -(-len(self.events) // size))
+    
+    def __len__(self):
+        return len(self.events)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.render_event(e) for e in self.events[index]]
+        return self.render_event(self.events[index])
+    
+    def __iter__(self):
+        for event in self.events:
+            yield self.render_event(event)
+    
+    def __str__(self):
+        return "\n".join(self)
+
+
+def _no_trace(event):
+    """非跟踪模式下的空记录函数"""
+    pass
+
+
+# 语句之后可以出现的 Token（错误恢复时的同步 Token）
+_STATEMENT_FOLLOW = (TokenType.SEMICOLON, TokenType.END)
 
 
 class ParseError(Exception):
@@ -18,24 +165,55 @@ class ParseError(Exception):
     pass
 
 
+class _Resync(Exception):
+    """
+    递归下降错误恢复时的同步信号
+    to_paren=True：已同步到 ')'，由最内层未闭合括号的 Factor 接住并匹配；否则同步到 ';' 或 '#'，语句结束
+    """
+    
+    def __init__(self, to_paren):
+        super().__init__()
+        self.to_paren = to_paren
+
+
 class Parser:
     """递归下降语法分析器"""
     
-    def __init__(self, tokens):
+    def __init__(self, tokens, trace=True):
+        # tokens 可以是 Token 列表，也可以是 lexer.TokenBuffer
+        # trace=False 为快速模式：不记录分析过程，只判断接受与否
         self.tokens = tokens
         self.pos = 0
         self.current_token = self.tokens[0] if tokens else None
-        self.parse_steps = []  # 记录分析过程
+        self.trace = ParseTrace(tokens) if trace else None  # 记录分析过程
+        self._emit = self.trace.events.append if trace else _no_trace
         self.error_messages = []  # 错误信息
+        self.statement_count = 0  # 多语句模式下已分析的语句数
+        self._recover = False     # 递归下降是否做错误恢复
+        self._error_pos = None    # 最近一次报告错误时的 Token 下标
+        self._paren_depth = 0     # 递归下降中未闭合的 '(' 数
         
-    def error(self, expected=""):
-        """语法错误处理"""
+    def report(self, expected=""):
+        """
+        记录语法错误但不抛出异常（错误恢复模式使用）
+        同一个位置只报告一次：恢复后在同步点上再次出错时不重复记录
+        """
+        if self.error_messages and self.pos == self._error_pos:
+            return self.error_messages[-1]
+        self._error_pos = self.pos
         msg = f"语法错误 at position {self.current_token.position}:\n"
         msg += f"  期望: {expected}\n"
         msg += f"  实际: {self.current_token}\n"
-        msg += f"  已分析的步骤数: {len(self.parse_steps)}"
+        if self.trace is not None:
+            msg += f"  已分析的步骤数: {len(self.trace)}"
+        else:
+            msg += f"  已分析的Token数: {self.pos}"
         self.error_messages.append(msg)
-        raise ParseError(msg)
+        return msg
+    
+    def error(self, expected=""):
+        """语法错误处理"""
+        raise ParseError(self.report(expected))
     
     def advance(self):
         """移动到下一个Token"""
@@ -43,13 +221,13 @@ class Parser:
         if self.pos < len(self.tokens):
             self.current_token = self.tokens[self.pos]
         else:
-            self.current_token = Token(TokenType.EOF, '', -1)
+            self.current_token = EOF_TOKEN
     
     def match(self, token_type):
         """匹配当前Token类型"""
         if self.current_token.type == token_type:
             matched_token = self.current_token
-            self.log_step(f"匹配 {token_type.name}: '{matched_token.value}'")
+            self._emit(self.pos << EVENT_SHIFT | EV_MATCH)
             self.advance()
             return matched_token
         else:
@@ -57,153 +235,348 @@ class Parser:
             return None
     
     def log_step(self, step):
-        """记录分析步骤"""
-        self.parse_steps.append(step)
+        """记录分析步骤（自由文本）"""
+        if self.trace is not None:
+            self.trace.add_text(step)
+    
+    @property
+    def parse_steps(self):
+        """渲染后的分析步骤列表"""
+        return list(self.trace) if self.trace is not None else []
     
     def get_parse_tree(self):
         """获取分析过程"""
-        return "\n".join(self.parse_steps)
+        return str(self.trace) if self.trace is not None else ""
     
     # ==================== 文法产生式对应的递归函数 ====================
     # 王宝飞
     
-    def parse(self):
-        """入口函数：Program -> Statement END"""
-        self.log_step("开始语法分析")
-        self.log_step("应用产生式: Program -> Statement END")
+    def parse(self, recover=False):
+        """
+        入口函数：Program -> Statement END
+        返回 (是否成功, ParseTrace)，快速模式下第二项为 None
+        recover=True 时出错后同步到 ')' 或 '#' 继续分析，所有错误记录在 error_messages 中；
+        跟踪模式下恢复也在递归下降中进行，第一个错误之前记录的步骤与不恢复时完全相同
+        """
+        self._emit(EV_START)
+        self._emit(EV_PROGRAM)
+        self._recover = recover
         
         try:
-            self.statement()
+            if self.trace is not None:
+                try:
+                    self.statement()
+                except _Resync:
+                    pass  # 已同步到 ';' 或 '#'
+            else:
+                # 快速模式不需要逐个产生式的记录，直接用迭代识别（接受的语言相同）
+                self.statement_iterative(recover)
             
-            # 检查是否以 # 结束
+            # 检查是否以 # 结束；恢复模式下语句提前结束时报告一次，再跳到 '#'
+            if recover and self.current_token.type != TokenType.END:
+                self.report("输入串应以 '#' 结束")
+                while self.current_token.type not in (TokenType.END, TokenType.EOF):
+                    self.advance()
             if self.current_token.type == TokenType.END:
                 self.match(TokenType.END)
-                self.log_step("✓ 语法分析成功！")
-                return True, self.get_parse_tree()
             else:
                 self.error("输入串应以 '#' 结束")
-                return False, self.get_parse_tree()
+        except ParseError:
+            pass
         
-        except ParseError as e:
-            self.log_step(f"✗ 语法分析失败")
-            return False, self.get_parse_tree()
+        if self.error_messages:
+            self._emit(EV_FAIL)
+            return False, self.trace
+        self._emit(EV_OK)
+        return True, self.trace
     
     def statement(self):
         """Statement -> ID ASSIGN Expr | Expr"""
-        self.log_step("进入 Statement")
+        self._emit(EV_ENTER_STATEMENT)
         
         # 预测：如果是 ID ASSIGN，则是赋值语句
         if self.current_token.type == TokenType.ID:
             # 需要向前看一个token判断是否是赋值语句
             if self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].type == TokenType.ASSIGN:
-                self.log_step("应用产生式: Statement -> ID ASSIGN Expr")
+                self._emit(EV_STATEMENT_ASSIGN)
                 self.match(TokenType.ID)
                 self.match(TokenType.ASSIGN)
                 self.expr()
             else:
                 # 只是表达式
-                self.log_step("应用产生式: Statement -> Expr")
+                self._emit(EV_STATEMENT_EXPR)
                 self.expr()
         else:
             # 表达式
-            self.log_step("应用产生式: Statement -> Expr")
+            self._emit(EV_STATEMENT_EXPR)
             self.expr()
         
-        self.log_step("退出 Statement")
+        self._emit(EV_EXIT_STATEMENT)
     
     def expr(self):
         """Expr -> Term Expr'"""
-        self.log_step("进入 Expr")
-        self.log_step("应用产生式: Expr -> Term Expr'")
+        self._emit(EV_ENTER_EXPR)
+        self._emit(EV_EXPR)
         
         self.term()
         self.expr_prime()
         
-        self.log_step("退出 Expr")
+        self._emit(EV_EXIT_EXPR)
     
     def expr_prime(self):
         """Expr' -> PLUS Term Expr' | MINUS Term Expr' | ε"""
-        self.log_step("进入 Expr'")
-        
-        if self.current_token.type == TokenType.PLUS:
-            self.log_step("应用产生式: Expr' -> PLUS Term Expr'")
-            self.match(TokenType.PLUS)
-            self.term()
-            self.expr_prime()
-        elif self.current_token.type == TokenType.MINUS:
-            self.log_step("应用产生式: Expr' -> MINUS Term Expr'")
-            self.match(TokenType.MINUS)
-            self.term()
-            self.expr_prime()
-        else:
-            # ε产生式
-            self.log_step("应用产生式: Expr' -> ε")
+        # 尾递归改写为循环：每轮对应一层 Expr'，记录的步骤与递归写法完全相同
+        depth = 0
+        while True:
+            self._emit(EV_ENTER_EXPR_PRIME)
+            depth += 1
+            
+            if self.current_token.type == TokenType.PLUS:
+                self._emit(EV_EXPR_PLUS)
+                self.match(TokenType.PLUS)
+                self.term()
+            elif self.current_token.type == TokenType.MINUS:
+                self._emit(EV_EXPR_MINUS)
+                self.match(TokenType.MINUS)
+                self.term()
+            else:
+                # ε产生式
+                self._emit(EV_EXPR_EPSILON)
+                break
         
-        self.log_step("退出 Expr'")
+        for _ in range(depth):
+            self._emit(EV_EXIT_EXPR_PRIME)
     
     def term(self):
         """Term -> Factor Term'"""
-        self.log_step("进入 Term")
-        self.log_step("应用产生式: Term -> Factor Term'")
+        self._emit(EV_ENTER_TERM)
+        self._emit(EV_TERM)
         
         self.factor()
         self.term_prime()
         
-        self.log_step("退出 Term")
+        self._emit(EV_EXIT_TERM)
     
     def term_prime(self):
         """Term' -> MULT Factor Term' | DIV Factor Term' | ε"""
-        self.log_step("进入 Term'")
-        
-        if self.current_token.type == TokenType.MULT:
-            self.log_step("应用产生式: Term' -> MULT Factor Term'")
-            self.match(TokenType.MULT)
-            self.factor()
-            self.term_prime()
-        elif self.current_token.type == TokenType.DIV:
-            self.log_step("应用产生式: Term' -> DIV Factor Term'")
-            self.match(TokenType.DIV)
-            self.factor()
-            self.term_prime()
-        else:
-            # ε产生式
-            self.log_step("应用产生式: Term' -> ε")
+        # 与 expr_prime 相同，尾递归改写为循环
+        depth = 0
+        while True:
+            self._emit(EV_ENTER_TERM_PRIME)
+            depth += 1
+            
+            if self.current_token.type == TokenType.MULT:
+                self._emit(EV_TERM_MULT)
+                self.match(TokenType.MULT)
+                self.factor()
+            elif self.current_token.type == TokenType.DIV:
+                self._emit(EV_TERM_DIV)
+                self.match(TokenType.DIV)
+                self.factor()
+            else:
+                # ε产生式
+                self._emit(EV_TERM_EPSILON)
+                break
         
-        self.log_step("退出 Term'")
+        for _ in range(depth):
+            self._emit(EV_EXIT_TERM_PRIME)
     
     def factor(self):
         """Factor -> LPAREN Expr RPAREN | ID | NUM"""
-        self.log_step("进入 Factor")
+        self._emit(EV_ENTER_FACTOR)
         
         if self.current_token.type == TokenType.LPAREN:
-            self.log_step("应用产生式: Factor -> LPAREN Expr RPAREN")
+            self._emit(EV_FACTOR_PAREN)
             self.match(TokenType.LPAREN)
-            self.expr()
-            self.match(TokenType.RPAREN)
+            self._paren_depth += 1
+            try:
+                try:
+                    self.expr()
+                except _Resync as sync:
+                    if not sync.to_paren:
+                        raise
+                # 括号内出错时同步到 ')'，把整个括号组当作一个操作数
+                if self.current_token.type != TokenType.RPAREN and self._recover:
+                    self.report("RPAREN")
+                    if not self.skip_to_sync():
+                        raise _Resync(False)
+                self.match(TokenType.RPAREN)
+            finally:
+                self._paren_depth -= 1
         
         elif self.current_token.type == TokenType.ID:
-            self.log_step("应用产生式: Factor -> ID")
+            self._emit(EV_FACTOR_ID)
             self.match(TokenType.ID)
         
         elif self.current_token.type == TokenType.NUM:
-            self.log_step("应用产生式: Factor -> NUM")
+            self._emit(EV_FACTOR_NUM)
             self.match(TokenType.NUM)
         
+        elif self._recover:
+            self.report("ID, NUM 或 '('")
+            raise _Resync(self.skip_to_sync())
+        
         else:
             self.error("ID, NUM 或 '('")
         
-        self.log_step("退出 Factor")
+        self._emit(EV_EXIT_FACTOR)
+    
+    def skip_to_sync(self):
+        """
+        递归下降的错误恢复：跳过 Token 直到同步 Token（规则与 synchronize 相同）
+        停在可以闭合未闭合 '(' 的 ')' 上返回 True，停在 ';'、'#' 或输入末尾返回 False；不匹配同步 Token
+        """
+        depth = 0
+        while True:
+            token_type = self.current_token.type
+            if token_type in _STATEMENT_FOLLOW or token_type == TokenType.EOF:
+                return False
+            if token_type == TokenType.LPAREN:
+                depth += 1
+            elif token_type == TokenType.RPAREN:
+                if depth:
+                    depth -= 1
+                elif self._paren_depth:
+                    return True
+            self.advance()
+
+
+    # ==================== 多语句模式（无递归） ====================
+    
+    def parse_program(self, recover=False):
+        """
+        入口函数：Program -> Statement { SEMICOLON Statement } [SEMICOLON] END
+        表达式用 expression_iterative 识别，不做逐个产生式的递归调用，
+        任意长的表达式和任意深的括号嵌套都在线性时间内完成，不受递归深度限制。
+        recover=True 时出错后同步到 ')'、';' 或 '#' 继续分析，一遍收集所有语法错误。
+        """
+        self._emit(EV_START_PROGRAM)
+        self._emit(EV_PROGRAM_LIST)
+        self.statement_count = 0
+        
+        try:
+            while True:
+                self.statement_iterative(recover)
+                self.statement_count += 1
+                
+                if (recover and self.current_token.type not in _STATEMENT_FOLLOW
+                        and self.current_token.type != TokenType.EOF):
+                    self.report("';' 或 '#'")
+                    self.synchronize(open_parens=None)
+                
+                if self.current_token.type == TokenType.SEMICOLON:
+                    self.match(TokenType.SEMICOLON)
+                    # 允许最后一条语句后面跟分号
+                    if self.current_token.type == TokenType.END:
+                        break
+                    continue
+                break
+            
+            if self.current_token.type != TokenType.END:
+                self.error("';' 或 '#'")
+            self.match(TokenType.END)
+            if self.error_messages:
+                self._emit(EV_FAIL)
+                return False, self.trace
+            self._emit(self.statement_count << EVENT_SHIFT | EV_PROGRAM_OK)
+            return True, self.trace
+        
+        except ParseError:
+            self._emit(EV_FAIL)
+            return False, self.trace
+    
+    def statement_iterative(self, recover=False):
+        """Statement -> ID ASSIGN Expr | Expr（表达式部分迭代识别）"""
+        if (self.current_token.type == TokenType.ID
+                and self.pos + 1 < len(self.tokens)
+                and self.tokens[self.pos + 1].type == TokenType.ASSIGN):
+            self._emit(EV_STATEMENT_ASSIGN)
+            self.match(TokenType.ID)
+            self.match(TokenType.ASSIGN)
+        else:
+            self._emit(EV_STATEMENT_EXPR)
+        self.expression_iterative(recover)
+    
+    def expression_iterative(self, recover=False):
+        """
+        迭代识别 Expr。
+        Expr' / Term' 的尾递归展开后，一个表达式就是“操作数 (运算符 操作数)*”，
+        操作数为 ID、NUM 或带括号的子表达式；未闭合的 '(' 压入显式栈代替递归。
+        接受的语言与递归下降的 expr() 完全相同，出错时的期望信息也一致。
+        recover=True 时出错只记录，然后用 synchronize 跳到同步 Token 继续。
+        """
+        open_parens = []
+        operators = (TokenType.PLUS, TokenType.MINUS, TokenType.MULT, TokenType.DIV)
+        
+        while True:
+            # 期望一个操作数
+            while self.current_token.type == TokenType.LPAREN:
+                open_parens.append(self.current_token)
+                self.match(TokenType.LPAREN)
+            
+            if self.current_token.type == TokenType.ID:
+                self.match(TokenType.ID)
+            elif self.current_token.type == TokenType.NUM:
+                self.match(TokenType.NUM)
+            elif not recover:
+                self.error("ID, NUM 或 '('")
+            else:
+                self.report("ID, NUM 或 '('")
+                if not self.synchronize(open_parens):
+                    return
+            
+            # 操作数之后：运算符、右括号或表达式结束
+            while True:
+                token_type = self.current_token.type
+                if token_type in operators:
+                    self.match(token_type)
+                    break
+                if not open_parens:
+                    return
+                if token_type == TokenType.RPAREN or not recover:
+                    self.match(TokenType.RPAREN)
+                    open_parens.pop()
+                    continue
+                self.report("RPAREN")
+                if not self.synchronize(open_parens):
+                    return
+    
+    def synchronize(self, open_parens):
+        """
+        错误恢复：跳过 Token 直到同步 Token
+            ')'      ：若有未闭合的 '('，把整个括号组当作一个操作数，返回 True 继续分析
+            ';' '#'  ：语句结束，返回 False（停在该 Token 上，由调用者匹配）
+        跳过的 Token 中成对出现的括号一并跳过；每个 Token 至多被跳过一次，总代价与输入长度成正比。
+        """
+        depth = 0
+        while True:
+            token_type = self.current_token.type
+            if token_type in _STATEMENT_FOLLOW or token_type == TokenType.EOF:
+                return False
+            if token_type == TokenType.LPAREN:
+                depth += 1
+            elif token_type == TokenType.RPAREN:
+                if depth:
+                    depth -= 1
+                elif open_parens:
+                    open_parens.pop()
+                    self.match(TokenType.RPAREN)
+                    return True
+            self.advance()
 
 
-def analyze(input_string):
+def analyze(input_string, trace=True, recover=False):
     # 对输入串进行完整的词法和语法分析
     # 王宝飞
+    # parse_tree 为 ParseTrace（str() 得到完整文本，render/page 按需渲染）；trace=False 时为空串
+    # recover=True 时出错后继续分析，errors 中是全部语法错误，error 为第一个
     result = {
         'success': False,
         'message': '',
         'tokens': [],
         'parse_tree': '',
-        'error': None
+        'error': None,
+        'errors': []
     }
     
     try:
@@ -213,9 +586,9 @@ def analyze(input_string):
         result['tokens'] = tokens
         
         # 2. 语法分析
-        parser = Parser(tokens)
-        success, parse_tree = parser.parse()
-        result['parse_tree'] = parse_tree
+        parser = Parser(tokens, trace)
+        success, parse_tree = parser.parse(recover)
+        result['parse_tree'] = parse_tree if trace else ''
         result['success'] = success
         
         if success:
@@ -224,6 +597,7 @@ def analyze(input_string):
             result['message'] = "error"
             if parser.error_messages:
                 result['error'] = parser.error_messages[0]
+                result['errors'] = parser.error_messages
         
     except Exception as e:
         result['success'] = False
@@ -233,6 +607,41 @@ def analyze(input_string):
     return result
 
 
+def analyze_program(input_string, trace=True, recover=False):
+    # 多语句模式：以 ';' 分隔的语句序列，以 '#' 结束
+    result = {
+        'success': False,
+        'message': '',
+        'tokens': [],
+        'parse_tree': '',
+        'statement_count': 0,
+        'error': None,
+        'errors': []
+    }
+    
+    try:
+        # 长输入使用紧凑的 TokenBuffer
+        tokens = Lexer(input_string).tokenize_buffer()
+        result['tokens'] = tokens
+        
+        parser = Parser(tokens, trace)
+        success, parse_tree = parser.parse_program(recover)
+        result['parse_tree'] = parse_tree if trace else ''
+        result['success'] = success
+        result['statement_count'] = parser.statement_count
+        result['message'] = "acc" if success else "error"
+        if not success and parser.error_messages:
+            result['error'] = parser.error_messages[0]
+            result['errors'] = parser.error_messages
+    
+    except Exception as e:
+        result['success'] = False
+        result['message'] = "error"
+        result['error'] = str(e)
+    
+    return result
+
+
 def test_parser():
     """测试语法分析器"""
     test_cases = [
@@ -274,6 +683,29 @@ def test_parser():
         print("=" * 80)
 
 
+def test_recovery():
+    """错误恢复的自检：每个同步点只报告一个错误"""
+    cases = [
+        # (分析函数, 输入串, 期望的错误位置)
+        (analyze_program, "a+b;", [4]),           # 分号后缺少语句：只在 EOF 处报告一次
+        (analyze, "a b + c #", [2]),              # 多余的 Token 使语句提前结束：同步到 '#'
+        (analyze, "a b + ) #", [2]),
+        (analyze, "a+b", [3]),                    # 缺少结束符
+        (analyze, "(a+)*(+b)#", [3, 6]),
+        (analyze_program, "a+;b*;c#", [2, 5]),
+    ]
+    for analyze_function, input_str, positions in cases:
+        for trace in (True, False):
+            result = analyze_function(input_str, trace=trace, recover=True)
+            reported = [int(message.split(':', 1)[0].rsplit(' ', 1)[1]) for message in result['errors']]
+            assert not result['success'] and reported == positions, (input_str, trace, result['errors'])
+            if analyze_function is analyze:
+                # 第一个错误与不恢复时相同
+                assert result['error'] == analyze(input_str, trace=trace)['error'], (input_str, trace)
+    print(f"错误恢复自检通过（{len(cases)} 个用例）")
+
+
 if __name__ == "__main__":
     test_parser()
+    test_recovery()
 
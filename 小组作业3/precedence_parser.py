@@ -0,0 +1,261 @@
+"""
+算符优先（precedence climbing）表达式分析器
+与 parser.Parser 接受相同的语言：
+    Program   -> Statement END
+    Statement -> ID ASSIGN Expr | Expr
+    Expr      -> 操作数 { 二元运算符 操作数 }，操作数为 ID、NUM 或 ( Expr )
+
+运算符的优先级与结合性由 BINARY_OPERATORS 表驱动，分析过程只用两个显式栈
+（操作数栈、运算符栈），增加优先级层次不会增加调用深度。
+每次归约调用 make_leaf / make_binary，子类可以重写它们来构造语法树。
+"""
+
+import time
+
+from lexer import TokenType, Lexer, EOF_TOKEN
+from parser import Parser, ParseError
+
+
+# 二元运算符表：Token 类型 -> (优先级, 是否右结合)，数字越大结合越紧
+BINARY_OPERATORS = {
+    TokenType.PLUS: (1, False),
+    TokenType.MINUS: (1, False),
+    TokenType.MULT: (2, False),
+    TokenType.DIV: (2, False),
+}
+
+# 运算符栈中的左括号标记
+_PAREN = None
+
+
+class PrecedenceParser:
+    """表驱动的算符优先表达式分析器"""
+
+    def __init__(self, tokens, operators=None):
+        # tokens 可以是 Token 列表，也可以是 lexer.TokenBuffer
+        self.tokens = tokens
+        self.operators = BINARY_OPERATORS if operators is None else operators
+        self.pos = 0
+        self.current_token = self.tokens[0] if tokens else EOF_TOKEN
+        self.error_messages = []  # 错误信息
+
+    def error(self, expected=""):
+        """语法错误处理（信息格式与 Parser 相同）"""
+        msg = f"语法错误 at position {self.current_token.position}:\n"
+        msg += f"  期望: {expected}\n"
+        msg += f"  实际: {self.current_token}\n"
+        msg += f"  已分析的Token数: {self.pos}"
+        self.error_messages.append(msg)
+        raise ParseError(msg)
+
+    def advance(self):
+        """移动到下一个Token"""
+        self.pos += 1
+        if self.pos < len(self.tokens):
+            self.current_token = self.tokens[self.pos]
+        else:
+            self.current_token = EOF_TOKEN
+
+    # ==================== 归约动作（可重写） ====================
+
+    def make_leaf(self, token):
+        """操作数（ID / NUM）归约的结果"""
+        return token
+
+    def make_binary(self, op_token, left, right):
+        """二元运算归约的结果"""
+        return left
+
+    def make_assign(self, id_token, value):
+        """赋值语句归约的结果"""
+        return value
+
+    # ==================== 分析 ====================
+
+    def parse(self):
+        """
+        入口函数：Program -> Statement END
+        返回 (是否成功, 语句归约的结果)
+        """
+        try:
+            result = self.parse_statement()
+            if self.current_token.type != TokenType.END:
+                self.error("输入串应以 '#' 结束")
+            self.advance()
+            return True, result
+        except ParseError:
+            return False, None
+
+    def parse_statement(self):
+        """Statement -> ID ASSIGN Expr | Expr"""
+        if (self.current_token.type == TokenType.ID
+                and self.pos + 1 < len(self.tokens)
+                and self.tokens[self.pos + 1].type == TokenType.ASSIGN):
+            id_token = self.current_token
+            self.advance()
+            self.advance()
+            return self.make_assign(id_token, self.parse_expression())
+        return self.parse_expression()
+
+    def parse_expression(self):
+        """
+        迭代的优先级爬升：
+            读入操作数后，若下一个运算符的优先级不高于栈顶运算符（左结合时取“不高于”，
+            右结合时取“低于”），先把栈顶归约，再压入新运算符。
+        左括号压入运算符栈作为屏障，遇到右括号时归约到屏障为止。
+        """
+        operators = self.operators
+        operand_stack = []
+        operator_stack = []  # 元素为 (优先级, 运算符Token)，或左括号标记 _PAREN
+
+        while True:
+            # 期望一个操作数
+            while self.current_token.type == TokenType.LPAREN:
+                operator_stack.append(_PAREN)
+                self.advance()
+
+            token = self.current_token
+            if token.type == TokenType.ID or token.type == TokenType.NUM:
+                operand_stack.append(self.make_leaf(token))
+                self.advance()
+            else:
+                self.error("ID, NUM 或 '('")
+
+            # 操作数之后：运算符、右括号或表达式结束
+            while True:
+                token = self.current_token
+                info = operators.get(token.type)
+                if info is not None:
+                    prec, right_assoc = info
+                    while operator_stack:
+                        top = operator_stack[-1]
+                        if top is _PAREN or top[0] < prec or (top[0] == prec and right_assoc):
+                            break
+                        self._reduce(operand_stack, operator_stack)
+                    operator_stack.append((prec, token))
+                    self.advance()
+                    break
+
+                # 没有更多运算符：归约到最近的左括号
+                while operator_stack and operator_stack[-1] is not _PAREN:
+                    self._reduce(operand_stack, operator_stack)
+                if not operator_stack:
+                    return operand_stack.pop()
+                if token.type != TokenType.RPAREN:
+                    self.error("RPAREN")
+                operator_stack.pop()
+                self.advance()
+
+    def _reduce(self, operand_stack, operator_stack):
+        """用栈顶运算符归约栈顶的两个操作数"""
+        op_token = operator_stack.pop()[1]
+        right = operand_stack.pop()
+        left = operand_stack.pop()
+        operand_stack.append(self.make_binary(op_token, left, right))
+
+
+def analyze_precedence(input_string):
+    # 用算符优先分析器做词法和语法分析，结果格式与 parser.analyze 相同（无分析过程）
+    result = {
+        'success': False,
+        'message': '',
+        'tokens': [],
+        'parse_tree': '',
+        'error': None
+    }
+
+    try:
+        tokens = Lexer(input_string).tokenize()
+        result['tokens'] = tokens
+
+        parser = PrecedenceParser(tokens)
+        success, _ = parser.parse()
+        result['success'] = success
+        result['message'] = "acc" if success else "error"
+        if not success and parser.error_messages:
+            result['error'] = parser.error_messages[0]
+
+    except Exception as e:
+        result['success'] = False
+        result['message'] = "error"
+        result['error'] = str(e)
+
+    return result
+
+
+def _parse_recursive(tokens):
+    """递归下降的 expr/term/factor 调用链（不记录过程）"""
+    parser = Parser(tokens, trace=False)
+    try:
+        parser.statement()
+        return parser.current_token.type == TokenType.END
+    except ParseError:
+        return False
+
+
+def benchmark(terms=2000, depth=50, repeat=5):
+    """
+    比较递归下降调用链与算符优先分析器的耗时
+    输入为 terms 个 'a*(b-1)/c' 相加，另外用 depth 层括号嵌套的表达式
+    比较两者在深层嵌套下的表现（递归下降每层括号要多 5 层调用）。
+    """
+    inputs = [
+        ("长表达式", '+'.join(['a*(b-1)/c'] * terms) + '#'),
+        ("嵌套括号", 'x=' + '(' * depth + 'a+b*c' + ')' * depth + '#'),
+    ]
+    clock = time.perf_counter
+
+    print(f"{'输入':<10} {'Token数':>8} {'递归下降(ms)':>14} {'算符优先(ms)':>14} {'加速比':>8}")
+    for name, text in inputs:
+        tokens = Lexer(text).tokenize()
+
+        best_rd = best_pp = float('inf')
+        for _ in range(repeat):
+            t = clock()
+            ok_rd = _parse_recursive(tokens)
+            best_rd = min(best_rd, clock() - t)
+
+            t = clock()
+            ok_pp, _ = PrecedenceParser(tokens).parse()
+            best_pp = min(best_pp, clock() - t)
+
+        if ok_rd != ok_pp:
+            raise RuntimeError(f"{name}：两种分析器结果不一致")
+        print(f"{name:<10} {len(tokens):>8} {best_rd * 1000:>14.2f} "
+              f"{best_pp * 1000:>14.2f} {best_rd / best_pp:>8.2f}")
+
+
+def test_precedence_parser():
+    """与递归下降分析器对比接受 / 拒绝结果"""
+    test_cases = [
+        "a+b#",
+        "a+b*c#",
+        "(a+b)*c#",
+        "x=3+5*2#",
+        "(a+b)*(c-d)#",
+        "result = (num1 + num2) * num3 / num4#",
+        "a+b*#",
+        "a+b",
+        "(a+b#",
+        "a)#",
+        "x=#",
+    ]
+
+    print("=" * 80)
+    print("算符优先分析器测试（与递归下降分析器对比）")
+    print("=" * 80)
+
+    for input_str in test_cases:
+        tokens = Lexer(input_str).tokenize()
+        ok_rd, _ = Parser(tokens, trace=False).parse()
+        ok_pp, _ = PrecedenceParser(tokens).parse()
+        mark = "一致" if ok_rd == ok_pp else "不一致！"
+        print(f"{input_str:<42} 递归下降: {'acc' if ok_rd else 'error':<6} "
+              f"算符优先: {'acc' if ok_pp else 'error':<6} {mark}")
+
+    print()
+    benchmark()
+
+
+if __name__ == "__main__":
+    test_precedence_parser()
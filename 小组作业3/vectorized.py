@@ -0,0 +1,201 @@
+"""
+表达式的向量化求值（NumPy）
+把变量绑定到 NumPy 数组（整列数据），语法树先做常量折叠，再编译为一串
+ufunc 调用：每一步写入预先分配的临时缓冲区，缓冲区按栈式分配并在多次调用之间复用。
+
+    expr = compile_vectorized("result = (num1 + num2) * num3 / num4#")
+    columns = {'num1': a1, 'num2': a2, 'num3': a3, 'num4': a4}
+    expr.evaluate(columns)          # 返回结果数组，并写入 columns['result']
+
+除以零遵循 NumPy 的浮点语义（得到 inf / nan），不抛出异常。
+"""
+
+import time
+
+import numpy as np
+
+from compiler import Num, Var, Assign, parse_ast, fold_constants, compile_expression
+
+
+_UFUNCS = {
+    '+': np.add,
+    '-': np.subtract,
+    '*': np.multiply,
+    '/': np.true_divide,
+}
+
+
+class VectorizedExpression:
+    """
+    编译后的向量化表达式
+    操作数统一编号：0..V-1 为变量列，随后是常量，再后是临时缓冲区，最后一个编号是结果
+        steps : [(ufunc, 左操作数编号, 右操作数编号, 结果编号), ...]
+    """
+
+    def __init__(self, tree):
+        tree = fold_constants(tree)
+        self.target = tree.name if isinstance(tree, Assign) else None
+        root = tree.value if isinstance(tree, Assign) else tree
+
+        self.variables = []
+        self.constants = []
+        self.has_division = False
+        self.root = None  # 没有运算时为根结点（变量或常量）
+        self._buffers = {}  # (形状, dtype) -> 临时缓冲区列表
+
+        var_index = {}
+        raw_steps = []
+        free = []           # 可复用的临时缓冲区（编号从 0 起）
+        temp_count = 0
+        operands = []       # ('v' | 'c' | 't' | 'r', 编号)
+
+        work = [(root, False)]
+        while work:
+            node, expanded = work.pop()
+            if isinstance(node, Var):
+                index = var_index.get(node.name)
+                if index is None:
+                    index = var_index[node.name] = len(self.variables)
+                    self.variables.append(node.name)
+                operands.append(('v', index))
+            elif isinstance(node, Num):
+                operands.append(('c', len(self.constants)))
+                self.constants.append(node.value)
+            elif not expanded:
+                work.append((node, True))
+                work.append((node.right, False))
+                work.append((node.left, False))
+            else:
+                right = operands.pop()
+                left = operands.pop()
+                # 结果写入操作数自己的临时缓冲区（原地运算），否则取一个空闲缓冲区
+                if left[0] == 't':
+                    dest = left
+                    if right[0] == 't':
+                        free.append(right[1])
+                elif right[0] == 't':
+                    dest = right
+                elif node is root:
+                    dest = ('r', 0)  # 最后一步直接写入结果，不占用临时缓冲区
+                else:
+                    if free:
+                        dest = ('t', free.pop())
+                    else:
+                        dest = ('t', temp_count)
+                        temp_count += 1
+                raw_steps.append((_UFUNCS[node.op], left, right, dest))
+                if node.op == '/':
+                    self.has_division = True
+                operands.append(dest)
+
+        self.temp_count = temp_count
+        if not raw_steps:
+            self.root = root
+            self.steps = []
+            return
+
+        # 统一编号；最后一步直接写入结果
+        const_base = len(self.variables)
+        temp_base = const_base + len(self.constants)
+        self.result_index = temp_base + temp_count
+
+        def number(ref):
+            kind, i = ref
+            if kind == 'v':
+                return i
+            if kind == 'c':
+                return const_base + i
+            if kind == 'r':
+                return self.result_index
+            return temp_base + i
+
+        self.steps = [(ufunc, number(a), number(b), number(d)) for ufunc, a, b, d in raw_steps]
+        ufunc, a, b, _ = self.steps[-1]
+        self.steps[-1] = (ufunc, a, b, self.result_index)
+
+    def _temporaries(self, shape, dtype):
+        """取（或分配）给定形状与类型的临时缓冲区"""
+        key = (shape, dtype)
+        buffers = self._buffers.get(key)
+        if buffers is None:
+            # 只保留最近一种形状，避免在不同长度的数据上反复调用时占用过多内存
+            self._buffers.clear()
+            buffers = self._buffers[key] = [np.empty(shape, dtype) for _ in range(self.temp_count)]
+        return buffers
+
+    def evaluate(self, columns, out=None):
+        """
+        columns 为变量名 -> 数组（或标量）的映射，各列按 NumPy 规则广播
+        out 可指定结果数组；赋值语句的结果同时写入 columns[target]
+        """
+        try:
+            arrays = [np.asarray(columns[name]) for name in self.variables]
+        except KeyError as e:
+            raise KeyError(f"未绑定的变量 '{e.args[0]}'") from None
+
+        if self.root is not None:
+            # 没有运算：结果就是变量列或常量
+            value = arrays[0] if arrays else np.asarray(self.root.value)
+            if out is None:
+                out = np.array(value, copy=True)
+            else:
+                np.copyto(out, value)
+            result = out
+        else:
+            shape = np.broadcast_shapes(*(a.shape for a in arrays)) if arrays else ()
+            dtype = np.result_type(*arrays, *self.constants)
+            if self.has_division:
+                dtype = np.result_type(dtype, np.float64)
+            if out is None:
+                out = np.empty(shape, dtype)
+
+            values = arrays + self.constants + self._temporaries(shape, dtype) + [out]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                for ufunc, a, b, dest in self.steps:
+                    ufunc(values[a], values[b], out=values[dest])
+            result = out
+
+        if self.target is not None:
+            columns[self.target] = result
+        return result
+
+
+def compile_vectorized(input_string):
+    """分析输入串（如 "y=a*(b-1)#"）并编译为向量化表达式"""
+    return VectorizedExpression(parse_ast(input_string))
+
+
+def benchmark(rows=10_000_000, sample=200_000):
+    """向量化求值与逐行解释执行（compiler.CompiledExpression.run）的耗时对比"""
+    text = "result = (num1 + num2) * num3 / num4 - 2 * (3 + 4)#"
+    rng = np.random.default_rng(0)
+    columns = {name: rng.random(rows) + 1.0 for name in ('num1', 'num2', 'num3', 'num4')}
+
+    expr = compile_vectorized(text)
+    expr.evaluate(columns)  # 预热，分配临时缓冲区
+    t = time.perf_counter()
+    result = expr.evaluate(columns)
+    vectorized = time.perf_counter() - t
+
+    program = compile_expression(text)
+    names = program.variables
+    t = time.perf_counter()
+    lists = [columns[name][:sample].tolist() for name in names[:program.inputs]]
+    values = [None] * len(names)
+    for row in zip(*lists):
+        values[:program.inputs] = row
+        program.run(values)
+    per_row = (time.perf_counter() - t) / sample
+
+    expected = (columns['num1'] + columns['num2']) * columns['num3'] / columns['num4'] - 14
+    assert np.allclose(result, expected)
+
+    print(f"表达式: {text}")
+    print(f"行数: {rows}")
+    print(f"向量化求值: {vectorized * 1000:.1f} ms")
+    print(f"逐行解释执行（按 {sample} 行估算）: {per_row * rows * 1000:.1f} ms")
+    print(f"加速比: {per_row * rows / vectorized:.1f}")
+
+
+if __name__ == "__main__":
+    benchmark()